@@ -20,8 +20,11 @@
 #
 
 import os
+import glob
 import json
 
+import results_store
+
 
 ## Delete file given by path if exists.
 def delete_file_if_exists(path):
@@ -37,17 +40,57 @@ def is_dir(folder_name):
         return True
 
 
-## Read and loads JSON file. Return dictionary with loaded data.
-def get_json_file_content(path):
-    data = []
-    try:
-        f = open(path, 'r', newline='')
-        data = json.loads(f.read())
-        f.close()
-    except:
-        print("File " + path + " not exists or it is not accessible for reading. If you are trying analyze logs, you have to generate them first.")
-    finally:
-        return data
+## Get paths of files with logs. When getting data is finished, logs are assembled in one file.
+#  Otherwise logs parts written by testing controllers are returned, so logs can be analyzed during testing too.
+def get_logs_files():
+    if os.path.isfile("../data/logs/logs.ndjson"):
+        return ["../data/logs/logs.ndjson"]
+    return sorted(glob.glob("../data/logs/logs_part_*.ndjson"))
+
+
+## Count lines (records) in NDJSON files without parsing them.
+def count_ndjson_records(paths):
+    count = 0
+    for path in paths:
+        with open(path, 'rb') as f:
+            for _ in f:
+                count += 1
+    return count
+
+
+## Read records from NDJSON files lazily one by one.
+#  Incomplete or corrupted lines, e.g. the last line of file which is still being written, are skipped.
+def read_ndjson_records(paths):
+    for path in paths:
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    pass
+
+
+## Count logs records for analysis. Results store is used when it exists, otherwise logs files are read.
+def count_logs_records():
+    if results_store.store_exists():
+        store = results_store.open_store()
+        try:
+            return results_store.count_records(store)
+        finally:
+            store.close()
+    return count_ndjson_records(get_logs_files())
+
+
+## Read logs records for analysis lazily one by one from results store when it exists, otherwise from logs files.
+def read_logs_records():
+    if results_store.store_exists():
+        store = results_store.open_store()
+        try:
+            yield from results_store.read_records(store)
+        finally:
+            store.close()
+    else:
+        yield from read_ndjson_records(get_logs_files())
 
 
 ## Write string content to file given by path.
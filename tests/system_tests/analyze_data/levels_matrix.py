@@ -0,0 +1,45 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+## Style of level x site matrix, included in header of output HTML files.
+MATRIX_STYLE = ".levels-matrix th, .levels-matrix td {width: auto; text-align: center;} "
+
+
+## Add value of one site on one JSR level to matrix. Matrix is dictionary (site => dictionary (JSR level => value)).
+#  Matrix is kept in memory until it is built, so its size grows with number of sites (one value for every site and level).
+def add_value(matrix, site, jsr_level, value):
+    matrix.setdefault(site, {})[jsr_level] = value
+
+
+## Build table with level x site matrix. Rows are sites in order of insertion to matrix, columns are JSR levels.
+def build_levels_matrix(title, matrix):
+    levels = sorted({jsr_level for site_values in matrix.values() for jsr_level in site_values}, key=str)
+    output = '<br><h2>' + title + '</h2><table class="levels-matrix"><tr><th>Site</th>'
+    for jsr_level in levels:
+        output += "<th>JSR level " + str(jsr_level) + "</th>"
+    output += "</tr>"
+    for site, site_values in matrix.items():
+        output += "<tr><td>" + site + "</td>"
+        for jsr_level in levels:
+            output += "<td>" + str(site_values.get(jsr_level, "")) + "</td>"
+        output += "</tr>"
+    output += "</table>"
+    return output
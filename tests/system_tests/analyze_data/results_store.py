@@ -0,0 +1,104 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+## Reading results of testing from results store (SQLite database written by getting data).
+#
+#  Records are rebuilt in the same format as records of logs files, so analyses can read them from both sources.
+#  Queries over indexed tables answer questions about results without reading all logs.
+
+import os
+import sqlite3
+from json import loads
+
+
+STORE_PATH = "../data/logs/results.sqlite"
+
+## Console entries added by JSR on given JSR level: entries of run with JSR without the same entry (level, source and
+#  message) in run without JSR of the same site and browser. Optional filter of level of entries (e.g. SEVERE).
+NEW_CONSOLE_ENTRIES_QUERY = """
+SELECT sites.site_number, sites.site, with_jsr.browser, COUNT(*)
+FROM runs AS with_jsr
+JOIN sites ON sites.site_number = with_jsr.site_number
+JOIN runs AS without_jsr ON without_jsr.jsr_level = with_jsr.jsr_level AND without_jsr.browser = with_jsr.browser
+    AND without_jsr.site_number = with_jsr.site_number AND without_jsr.with_jsr = 0
+JOIN console_entries AS entry ON entry.run_id = with_jsr.run_id
+WHERE with_jsr.jsr_level = ? AND with_jsr.with_jsr = 1 AND with_jsr.completed = 1 AND without_jsr.completed = 1
+    AND (? IS NULL OR entry.level = ?)
+    AND NOT EXISTS (SELECT 1 FROM console_entries AS original WHERE original.run_id = without_jsr.run_id
+                    AND original.level IS entry.level AND original.source IS entry.source AND original.message IS entry.message)
+GROUP BY sites.site_number, with_jsr.browser
+ORDER BY sites.site_number, with_jsr.browser
+"""
+
+
+## Test if results store exists.
+def store_exists():
+    return os.path.isfile(STORE_PATH)
+
+
+## Open results store for reading.
+def open_store():
+    return sqlite3.connect('file:' + STORE_PATH + '?mode=ro', uri=True)
+
+
+## Count logs records (pairs of runs without and with JSR) in results store.
+def count_records(store):
+    return store.execute("SELECT COUNT(*) FROM runs WHERE with_jsr = 1").fetchone()[0]
+
+
+## Get data of one run as values of logs record: logs, dialogs, timings, performance and errors.
+def read_run(store, run_id, completed, dialogs_dismissed, performance):
+    if completed:
+        logs = [{'level': level, 'source': source, 'message': message, 'timestamp': timestamp} for level, source, message, timestamp in
+                store.execute("SELECT level, source, message, timestamp FROM console_entries WHERE run_id = ? ORDER BY position", (run_id,))]
+    else:
+        logs = "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE"
+    timings = dict(store.execute("SELECT phase, duration FROM timings WHERE run_id = ?", (run_id,)))
+    errors = [{'type': error_type, 'phase': phase, 'message': message, 'time': time} for error_type, phase, message, time in
+              store.execute("SELECT type, phase, message, time FROM page_errors WHERE run_id = ? ORDER BY position", (run_id,))]
+    return logs, dialogs_dismissed, timings, loads(performance) if performance is not None else None, errors
+
+
+## Read logs records from results store lazily one by one, sorted by site number.
+#  Records have the same format as records of logs files.
+def read_records(store):
+    runs = store.execute("""
+        SELECT sites.site, sites.site_number, with_jsr.browser, with_jsr.jsr_level,
+               with_jsr.run_id, with_jsr.completed, with_jsr.dialogs_dismissed, with_jsr.performance,
+               without_jsr.run_id, without_jsr.completed, without_jsr.dialogs_dismissed, without_jsr.performance, without_jsr.capture_date
+        FROM runs AS with_jsr
+        JOIN sites ON sites.site_number = with_jsr.site_number
+        JOIN runs AS without_jsr ON without_jsr.jsr_level = with_jsr.jsr_level AND without_jsr.browser = with_jsr.browser
+            AND without_jsr.site_number = with_jsr.site_number AND without_jsr.with_jsr = 0
+        WHERE with_jsr.with_jsr = 1
+        ORDER BY sites.site_number, with_jsr.browser, with_jsr.jsr_level""")
+    for site, site_number, browser, jsr_level, *run_with_jsr, run_id, completed, dialogs_dismissed, performance, capture_date in runs:
+        record = {'site': site, 'site_number': site_number, 'browser': browser, 'jsr_level': jsr_level}
+        for side, run in (('without_jsr', read_run(store, run_id, completed, dialogs_dismissed, performance)), ('with_jsr', read_run(store, *run_with_jsr))):
+            record['logs_' + side], record['dialogs_' + side], record['timings_' + side], record['performance_' + side], record['errors_' + side] = run
+        record['baseline_capture_date'] = capture_date
+        yield record
+
+
+## Get sites with console entries added by JSR on given JSR level. Return list of tuples
+#  (site_number, site, browser, number of added entries). Level of entries (e.g. SEVERE) can be given.
+def get_new_console_entries(store, jsr_level, entry_level=None):
+    return store.execute(NEW_CONSOLE_ENTRIES_QUERY, (jsr_level, entry_level, entry_level)).fetchall()
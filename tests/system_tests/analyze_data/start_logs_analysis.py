@@ -23,6 +23,7 @@ import levenshtein_distance as levenshtein
 import cosine_similarity as cosine
 import simple_comparison as simple
 import io_funcs as io
+import levels_matrix
 
 
 ## Build header of output HTML file.
@@ -38,7 +39,8 @@ def html_header():
            ".colored-results-table-visible td {width: 33%; border: none; padding: 5px; color: white; text-align: center;} " \
            ".colored-results-table-visible .method {background-color: red;} " \
            ".colored-results-table {display: none;} " \
-           ".colored-results-table-visible {display: table; margin-bottom: 5px} " \
+           ".colored-results-table-visible {display: table; margin-bottom: 5px} " + \
+           levels_matrix.MATRIX_STYLE + \
            "</style>" \
            "</head>" \
            "<body><h1>Logs comparison</h1>"
@@ -51,7 +53,7 @@ def html_footer():
 
 ## Build table with logs for one site. Insert to output HTML file.
 def build_site_logs_table(site, site_number):
-    output = "<br><h2>" + str(site_number) + ") " + site['site'] + "</h2><table><tr><th>Without JSR</th><th>With JSR</th></tr>"
+    output = "<br><h2>" + str(site_number) + ") " + site['site'] + " (JSR level " + str(site['jsr_level']) + ")</h2><table><tr><th>Without JSR</th><th>With JSR</th></tr>"
     i = 0
     max_lenght = 0
     if site['logs_with_jsr'] != "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE":
@@ -103,24 +105,42 @@ def build_site_logs_table(site, site_number):
     return output
 
 
+## Get type of the last error of browser which failed to get data of site (with JSR first), "ERROR" if it is not known.
+def get_error_type(site):
+    failed_browser = 'with_jsr' if site['logs_with_jsr'] == "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE" else 'without_jsr'
+    errors = site.get('errors_' + failed_browser)
+    return errors[-1]['type'] if errors else "ERROR"
+
+
+## Count logs added by JSR according to Simple comparison. Type of error is returned for sites which were not loaded.
+def count_added_logs(site):
+    if site['logs_without_jsr'] == "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE" or site['logs_with_jsr'] == "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE":
+        return get_error_type(site)
+    return len([log for log in site['logs_with_jsr'] if simple.was_log_added(log, site['logs_without_jsr'])])
+
+
 ## Main function of logs analysis.
+#  Logs are read lazily site by site (from results store if it exists) and output HTML file is written continuously,
+#  so logs of only one site are kept in memory. Level x site matrix with numbers of added logs is appended at the end,
+#  it keeps one number for every site and level in memory until all sites are analysed.
 def main():
     io.delete_file_if_exists("../data/logs/logs_comparison.html")
 
-    sites_logs = io.get_json_file_content("../data/logs/logs.json")
-
-    output = html_header()
-    j = 1
-    sites_number = len(sites_logs)
+    sites_number = io.count_logs_records()
     if sites_number == 0:
         print("No logs for analysis found. Please, include getting logs to configuration and run getting data first.")
-    for site in sites_logs:
-        print("Site " + str(j) + " of " + str(sites_number) + ": " + site['site'])
-        output += build_site_logs_table(site, j)
-        j += 1
-    output += html_footer()
 
-    io.write_file("../data/logs/logs_comparison.html", output)
+    with open("../data/logs/logs_comparison.html", 'w', newline='') as output:
+        output.write(html_header())
+        added_logs = {}
+        j = 1
+        for site in io.read_logs_records():
+            print("Site " + str(j) + " of " + str(sites_number) + ": " + site['site'])
+            output.write(build_site_logs_table(site, j))
+            levels_matrix.add_value(added_logs, site['site'], site['jsr_level'], count_added_logs(site))
+            j += 1
+        output.write(levels_matrix.build_levels_matrix("Numbers of logs added by JSR (Simple comparison)", added_logs))
+        output.write(html_footer())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import sys
+
+import results_store
+
+
+## Main function of query of logs added by JSR. It answers directly from results store, which sites got new console
+#  entries on given JSR level, without reading all logs.
+#  Usage: python start_new_logs_query.py <JSR level> [<level of console entries, e.g. SEVERE>]
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python start_new_logs_query.py <JSR level> [<level of console entries, e.g. SEVERE>]")
+        return
+    if not results_store.store_exists():
+        print("No results store found. Please, run getting data first.")
+        return
+    jsr_level = int(sys.argv[1])
+    entry_level = sys.argv[2] if len(sys.argv) > 2 else None
+    store = results_store.open_store()
+    try:
+        sites = results_store.get_new_console_entries(store, jsr_level, entry_level)
+    finally:
+        store.close()
+    for site_number, site, browser, added_entries in sites:
+        print(str(site_number) + ") " + site + " (" + browser + "): " + str(added_entries))
+    print("Sites with console entries added by JSR on level " + str(jsr_level) + ": " + str(len(sites)))
+
+
+if __name__ == "__main__":
+    main()
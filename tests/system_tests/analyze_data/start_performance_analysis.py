@@ -0,0 +1,130 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from statistics import median
+
+import io_funcs as io
+import levels_matrix
+
+
+## Compared values of performance data: (group in performance data, name of value, unit).
+COMPARED_VALUES = [('navigation', 'responseStart', 'ms'),
+                   ('navigation', 'domContentLoadedEventEnd', 'ms'),
+                   ('navigation', 'loadEventEnd', 'ms'),
+                   ('paint', 'first-contentful-paint', 'ms'),
+                   ('metrics', 'ScriptDuration', 'ms'),
+                   ('metrics', 'TaskDuration', 'ms'),
+                   ('metrics', 'JSHeapUsedSize', 'B')]
+
+
+## Build header of output HTML file.
+def html_header():
+    return "<html>" \
+           "<head><title>Performance comparison</title>" \
+           "<style>" \
+           "body {background-color: white} " \
+           "table {width: 100%; border-collapse: collapse; table-layout: fixed;} " \
+           ".overhead {background-color: LightPink} " \
+           "h2 {margin-left: 10px;} " \
+           "th, td {border: 1px solid black; word-wrap: break-word; padding: 5px;} " + \
+           levels_matrix.MATRIX_STYLE + \
+           "</style>" \
+           "</head>" \
+           "<body><h1>Performance comparison</h1>"
+
+
+## Build footer of output HTML file.
+def html_footer():
+    return "<br><br></body></html>"
+
+
+## Get compared value from performance data. Return None if value was not obtained.
+def get_value(performance, group, name):
+    if not performance or not performance.get(group):
+        return None
+    return performance[group].get(name)
+
+
+## Build table with performance data for one site on one JSR level. Differences of values (with JSR - without JSR)
+#  are collected to given dictionary (name of value => list of differences).
+def build_site_performance_table(site, site_number, differences):
+    output = "<br><h2>" + str(site_number) + ") " + site['site'] + " (JSR level " + str(site['jsr_level']) + ")</h2><table><tr><th>Value</th><th>Without JSR</th><th>With JSR</th><th>Difference</th></tr>"
+    for group, name, unit in COMPARED_VALUES:
+        without_jsr = get_value(site.get('performance_without_jsr'), group, name)
+        with_jsr = get_value(site.get('performance_with_jsr'), group, name)
+        difference = None
+        if without_jsr is not None and with_jsr is not None:
+            difference = round(with_jsr - without_jsr, 1)
+            differences.setdefault(name, []).append(difference)
+        output += "<tr"
+        if difference is not None and difference > 0:
+            output += ' class="overhead"'
+        output += "><td>" + name + " [" + unit + "]</td><td>" + str(without_jsr) + "</td><td>" + str(with_jsr) + "</td><td>" + str(difference) + "</td></tr>"
+    output += "</table>"
+    return output
+
+
+## Build table with summary of differences of all sites on one JSR level.
+def build_summary_table(jsr_level, differences):
+    output = "<br><h2>Summary of JSR level " + str(jsr_level) + "</h2><table><tr><th>Value</th><th>Sites</th><th>Median difference</th><th>Sites slower with JSR</th></tr>"
+    for group, name, unit in COMPARED_VALUES:
+        values = differences.get(name, [])
+        output += "<tr><td>" + name + " [" + unit + "]</td><td>" + str(len(values)) + "</td>"
+        if values:
+            output += "<td>" + str(round(median(values), 1)) + "</td><td>" + str(len([value for value in values if value > 0])) + "</td></tr>"
+        else:
+            output += "<td>None</td><td>None</td></tr>"
+    output += "</table>"
+    return output
+
+
+## Main function of performance analysis.
+#  Records are read lazily site by site (from results store if it exists) and output HTML file is written continuously.
+#  Summary of every JSR level and level x site matrix with differences of page load time are appended at the end.
+#  Matrix keeps one difference for every site and level in memory until all sites are analysed.
+def main():
+    io.delete_file_if_exists("../data/logs/performance_comparison.html")
+
+    sites_number = io.count_logs_records()
+    if sites_number == 0:
+        print("No data for analysis found. Please, include performance test to configuration and run getting data first.")
+
+    differences = {}
+    load_differences = {}
+    with open("../data/logs/performance_comparison.html", 'w', newline='') as output:
+        output.write(html_header())
+        j = 1
+        for site in io.read_logs_records():
+            print("Site " + str(j) + " of " + str(sites_number) + ": " + site['site'])
+            site_differences = {}
+            output.write(build_site_performance_table(site, j, site_differences))
+            for name, values in site_differences.items():
+                differences.setdefault(site['jsr_level'], {}).setdefault(name, []).extend(values)
+            levels_matrix.add_value(load_differences, site['site'], site['jsr_level'], site_differences.get('loadEventEnd', [None])[0])
+            j += 1
+        for jsr_level, level_differences in sorted(differences.items(), key=lambda item: str(item[0])):
+            output.write(build_summary_table(jsr_level, level_differences))
+        output.write(levels_matrix.build_levels_matrix("Differences of page load time (loadEventEnd) [ms]", load_differences))
+        output.write(html_footer())
+
+
+if __name__ == "__main__":
+    main()
@@ -19,11 +19,13 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from os import listdir
+from os import listdir, path
+import glob
 import cv2
 import numpy as np
 
 import io_funcs as io
+import levels_matrix
 
 
 ## Build header of output HTML file.
@@ -46,7 +48,8 @@ def html_header():
            ".site-container-header {background-color: rgb(240,240,240); border-bottom: 1px solid black;} " \
            ".visible {display: table;} " \
            ".hidden {display: none;} " \
-           "#treshold-value {font-weight: bold;} " \
+           "#treshold-value {font-weight: bold;} " + \
+           levels_matrix.MATRIX_STYLE + \
            "</style>" \
            "</head>" \
            '<body><h1>Screenshots comparison</h1>' \
@@ -82,24 +85,51 @@ def html_footer():
            "</body></html>"
 
 
-## Build table with screenshots and diferences of screenshots for one site. Insert to output HTML file.
-def build_site_screenshots_comparison(site, site_name, site_number, average_color_of_differences):
+## Build table with screenshots and diferences of screenshots for one site on one JSR level. Insert to output HTML file.
+def build_site_screenshots_comparison(site, site_name, site_number, jsr_level, average_color_of_differences):
+    screen_without_jsr = get_screenshot_file(site, "without_jsr")
+    screen_with_jsr = get_screenshot_file(site, "with_jsr_level_" + jsr_level)
     output = '<table class="site-container visible" mean_pixel_value_of_diff="' + str(average_color_of_differences) + '"><tr class="site-container-header"><td class="site-container-td"><h2>' + str(site_number) +\
-             ") "  + site_name + '</h2></td><td class="site-container-td"><h3>Mean pixel value in Differences image: ' + str(average_color_of_differences) + '</h3></td></tr><tr><td colspan="2" class="site-container-td"><table><tr><th>Without JSR</th><th>With JSR</th></tr>'
-    output += '<tr><td><img src="' + site + '/without_jsr.png"></td><td><img src="' + site + '/with_jsr.png"></td></tr></table>'
-    output += '<table class="differences-table"><tr><th>Differences</th></tr><tr><td><img src="' + site + '/differences.png"></td></tr></table></td></tr></table>'
+             ") "  + site_name + ' (JSR level ' + jsr_level + ')</h2></td><td class="site-container-td"><h3>Mean pixel value in Differences image: ' + str(average_color_of_differences) + '</h3></td></tr><tr><td colspan="2" class="site-container-td"><table><tr><th>Without JSR</th><th>With JSR</th></tr>'
+    output += '<tr><td><img src="' + site + '/' + str(screen_without_jsr) + '"></td><td><img src="' + site + '/' + str(screen_with_jsr) + '"></td></tr></table>'
+    output += '<table class="differences-table"><tr><th>Differences</th></tr><tr><td><img src="' + site + '/differences_level_' + jsr_level + '.png"></td></tr></table></td></tr></table>'
     return output
 
 
-## Create difference image between screenshot with JSR and screenshot without JSR by substracting
+## Extensions of screenshot files (screenshots are saved as PNG or JPEG).
+SCREENSHOT_EXTENSIONS = ['.png', '.jpg']
+
+
+## Get name of screenshot file of site with given name (without extension). Return None if there is no such screenshot.
+def get_screenshot_file(site, name):
+    for extension in SCREENSHOT_EXTENSIONS:
+        if path.isfile("../data/screenshots/" + site + "/" + name + extension):
+            return name + extension
+    return None
+
+
+## Get JSR levels on which screenshots of site were taken.
+def get_site_jsr_levels(site):
+    jsr_levels = set()
+    for extension in SCREENSHOT_EXTENSIONS:
+        for screenshot_path in glob.glob("../data/screenshots/" + site + "/with_jsr_level_*" + extension):
+            jsr_levels.add(path.basename(screenshot_path)[len("with_jsr_level_"):-len(extension)])
+    return sorted(jsr_levels)
+
+
+## Create difference image between screenshot with JSR on given level and screenshot without JSR by substracting
 #  one image from another.
-def create_differences_img(site):
-    screen_without_jsr = cv2.imread("../data/screenshots/" + site + "/without_jsr.png")
-    screen_with_jsr = cv2.imread("../data/screenshots/" + site + "/with_jsr.png")
-    if screen_without_jsr is None or screen_with_jsr is None:
+def create_differences_img(site, jsr_level):
+    screen_without_jsr_file = get_screenshot_file(site, "without_jsr")
+    screen_with_jsr_file = get_screenshot_file(site, "with_jsr_level_" + jsr_level)
+    if screen_without_jsr_file is None or screen_with_jsr_file is None:
+        return None
+    screen_without_jsr = cv2.imread("../data/screenshots/" + site + "/" + screen_without_jsr_file)
+    screen_with_jsr = cv2.imread("../data/screenshots/" + site + "/" + screen_with_jsr_file)
+    if screen_without_jsr is None or screen_with_jsr is None or screen_without_jsr.shape != screen_with_jsr.shape:
         return None
     differences = cv2.subtract(screen_with_jsr, screen_without_jsr)
-    cv2.imwrite("../data/screenshots/" + site + "/differences.png", differences)
+    cv2.imwrite("../data/screenshots/" + site + "/differences_level_" + jsr_level + ".png", differences)
     return cv2.cvtColor(differences, cv2.COLOR_BGR2GRAY)
 
 
@@ -113,6 +143,8 @@ def get_rounded_mean_pixel_value(img, precision):
 
 
 ## Main function of screenshots analysis.
+#  Screenshot without JSR is compared with screenshot on every JSR level. Level x site matrix with mean pixel values
+#  of differences is appended at the end.
 def main():
     io.delete_file_if_exists("../data/screenshots/screenshots_comparison.html")
 
@@ -124,14 +156,18 @@ def main():
     sites_number = len(sites)
     if sites_number == 0:
         print("No screenshots for analysis found. Please, include getting screenshots to configuration and run getting data first.")
+    mean_pixel_values = {}
     for site in sites:
         site_name = site.split('_', 1)[1]
         print("Site " + str(j) + " of " + str(sites_number) + ": " + site_name)
-        differences_gray = create_differences_img(site)
-        mean_pixel_value_of_difference = get_rounded_mean_pixel_value(differences_gray, 3)
-        output += build_site_screenshots_comparison(site, site_name, j, mean_pixel_value_of_difference)
+        for jsr_level in get_site_jsr_levels(site):
+            differences_gray = create_differences_img(site, jsr_level)
+            mean_pixel_value_of_difference = get_rounded_mean_pixel_value(differences_gray, 3)
+            output += build_site_screenshots_comparison(site, site_name, j, jsr_level, mean_pixel_value_of_difference)
+            levels_matrix.add_value(mean_pixel_values, site_name, jsr_level, mean_pixel_value_of_difference)
         j += 1
 
+    output += levels_matrix.build_levels_matrix("Mean pixel values in Differences images", mean_pixel_values)
     output += html_footer()
     io.write_file("../data/screenshots/screenshots_comparison.html", output)
 
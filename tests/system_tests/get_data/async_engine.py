@@ -0,0 +1,574 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import asyncio
+from base64 import b64encode
+from json import dumps, loads
+from urllib.parse import urlsplit
+from time import monotonic, time
+
+from configuration import Config
+from website import Logs
+from page_data_builder import PageDataBuilder, build_error_page_data
+import io_funcs as io
+import devtools
+import page_performance
+import screenshots
+import fixture_server
+import page_errors
+import journal
+import coordinator
+import results_store
+import metrics
+import top_sites as sites
+import baseline_cache
+import jsr_extension
+import local_drivers
+import web_replay
+from timings import PhaseTimer
+from browser_recycling import BrowserRecycler, get_user_data_dir
+import process_groups
+from web_browser_type import BrowserType
+from test_type import TestType
+from page_error import PageError
+
+
+## Names of capabilities defined by W3C WebDriver standard.
+W3C_CAPABILITIES = ['acceptInsecureCerts', 'browserName', 'browserVersion', 'pageLoadStrategy', 'platformName',
+                    'proxy', 'setWindowRect', 'strictFileInteractability', 'timeouts', 'unhandledPromptBehavior']
+
+
+## Exception raised when WebDriver server returns an error for a command.
+class WebDriverCommandError(Exception):
+    def __init__(self, error, message):
+        super().__init__(error + ": " + message)
+        self.error = error
+        self.message = message
+
+
+## AsyncWebDriver object represents one browser session driven through W3C WebDriver protocol.
+#
+#  Commands are sent as HTTP requests over one keep-alive connection owned by the session.
+#  Only commands needed for getting data are implemented.
+class AsyncWebDriver:
+    def __init__(self, executor_url):
+        url = urlsplit(executor_url)
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.base_path = url.path.rstrip('/')
+        self.session_id = None
+        self.capabilities = {}
+        self.reader = None
+        self.writer = None
+        self.lock = asyncio.Lock()
+
+    ## Open a new connection to WebDriver server.
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    ## Close connection to WebDriver server.
+    def disconnect(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = None
+        self.writer = None
+
+    ## Read one HTTP response from the connection. Return status code and body.
+    async def read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("WebDriver server closed the connection.")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, value = line.decode('latin-1').split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = b''
+            while True:
+                chunk_size = int((await self.reader.readline()).split(b';')[0], 16)
+                if chunk_size == 0:
+                    while (await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                body += await self.reader.readexactly(chunk_size)
+                await self.reader.readexactly(2)
+        elif 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        else:
+            body = await self.reader.read()
+            headers['connection'] = 'close'
+        if headers.get('connection', '').lower() == 'close':
+            self.disconnect()
+        return status, body
+
+    ## Send HTTP request to WebDriver server and return the decoded JSON response.
+    #  When a kept alive connection was closed by server meanwhile, the request is sent once more over a new connection.
+    async def request(self, method, path, body=None):
+        payload = b'' if body is None else dumps(body).encode('utf-8')
+        request = (method + ' ' + self.base_path + path + ' HTTP/1.1\r\n' +
+                   'Host: ' + self.host + ':' + str(self.port) + '\r\n' +
+                   'Content-Type: application/json;charset=UTF-8\r\n' +
+                   'Content-Length: ' + str(len(payload)) + '\r\n' +
+                   'Connection: keep-alive\r\n\r\n').encode('latin-1') + payload
+        async with self.lock:
+            for attempt in range(2):
+                reused_connection = self.writer is not None
+                if not reused_connection:
+                    await self.connect()
+                try:
+                    self.writer.write(request)
+                    await self.writer.drain()
+                    status, response = await self.read_response()
+                    break
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    self.disconnect()
+                    if not reused_connection or attempt == 1:
+                        raise
+                except:
+                    # Response was not read completely (e.g. command was cancelled), connection can not be reused.
+                    self.disconnect()
+                    raise
+        data = loads(response.decode('utf-8')) if response else {}
+        value = data.get('value')
+        if status >= 400 or data.get('status', 0) != 0 or (isinstance(value, dict) and 'error' in value):
+            if isinstance(value, dict):
+                raise WebDriverCommandError(str(value.get('error', data.get('status'))), str(value.get('message', '')))
+            raise WebDriverCommandError(str(status), str(value))
+        return data
+
+    ## Send WebDriver command in the current session and return its value.
+    async def command(self, method, path, body=None):
+        data = await self.request(method, '/session/' + self.session_id + path, body)
+        return data.get('value')
+
+    ## Start a new browser session with given capabilities.
+    #  Capabilities are sent in legacy form and in W3C form, which may contain only standard and extension capabilities.
+    async def start_session(self, capabilities):
+        w3c_capabilities = {}
+        for name, value in capabilities.items():
+            if name in W3C_CAPABILITIES or ':' in name:
+                w3c_capabilities[name] = value
+        data = await self.request('POST', '/session', {
+            'desiredCapabilities': capabilities,
+            'capabilities': {'alwaysMatch': w3c_capabilities}
+        })
+        if 'sessionId' in data:
+            self.session_id = data['sessionId']
+            self.capabilities = data['value']
+        else:
+            self.session_id = data['value']['sessionId']
+            self.capabilities = data['value']['capabilities']
+
+    ## End the browser session and close connection.
+    async def quit(self):
+        try:
+            if self.session_id is not None:
+                await self.request('DELETE', '/session/' + self.session_id)
+        finally:
+            self.session_id = None
+            self.disconnect()
+
+    async def set_page_load_timeout(self, timeout):
+        await self.command('POST', '/timeouts', {'pageLoad': int(timeout * 1000)})
+
+    async def get(self, url):
+        await self.command('POST', '/url', {'url': url})
+
+    async def get_log(self, log_type):
+        return await self.command('POST', '/log', {'type': log_type})
+
+    async def execute_script(self, script, args=()):
+        return await self.command('POST', '/execute/sync', {'script': script, 'args': args})
+
+    async def execute_async_script(self, script, args=()):
+        return await self.command('POST', '/execute/async', {'script': script, 'args': args})
+
+    async def execute_cdp_command(self, cmd, params):
+        return await self.command('POST', '/goog/cdp/execute', {'cmd': cmd, 'params': params})
+
+
+## Build capabilities for a new browser session. Capabilities correspond to those created by driver.create_driver.
+def build_capabilities(browser_type, with_jsr):
+    if browser_type == BrowserType.CHROME:
+        chrome_options = {'args': ['--start-maximized'] + web_replay.get_browser_arguments(), 'perfLoggingPrefs': devtools.get_perf_logging_prefs()}
+        if with_jsr:
+            with open(Config.jsr_extension_for_chrome_path, 'rb') as crx:
+                chrome_options['extensions'] = [b64encode(crx.read()).decode('ascii')]
+        return {
+            'browserName': 'chrome',
+            'javascriptEnabled': True,
+            'loggingPrefs': {'browser': 'ALL', 'performance': 'ALL'},
+            'goog:loggingPrefs': {'browser': 'ALL', 'performance': 'ALL'},
+            'unhandledPromptBehavior': 'accept',
+            'goog:chromeOptions': chrome_options
+        }
+
+
+## Set JSR level in web browser directly in extension storage, see driver.set_jsr_level.
+async def set_jsr_level(my_driver, browser_type, level):
+    await my_driver.get(jsr_extension.get_jsr_options_page_url(browser_type))
+    await my_driver.execute_async_script(jsr_extension.SET_JSR_LEVEL_SCRIPT, [str(level)])
+
+
+## Create browser session and start web browser.
+async def create_driver(browser_type, with_jsr, jsr_level, command_executor_url):
+    my_driver = AsyncWebDriver(command_executor_url)
+    await my_driver.start_session(build_capabilities(browser_type, with_jsr))
+    try:
+        if with_jsr:
+            await set_jsr_level(my_driver, browser_type, jsr_level)
+        await my_driver.set_page_load_timeout(Config.page_load_timeout)
+        if Config.screenshot_viewport_size is not None:
+            await my_driver.execute_cdp_command('Emulation.setDeviceMetricsOverride', screenshots.get_viewport_params())
+        if TestType.PERFORMANCE in Config.perform_tests:
+            await enable_performance_metrics(my_driver, browser_type)
+    except:
+        await quit_driver(my_driver)
+        raise
+    return my_driver
+
+
+## End browser session, ignore errors because session may be already broken.
+#  Processes of browser which were not ended by WebDriver server (e.g. renderers of hung page) are killed.
+#  Processes are searched in thread pool, so event loop is not blocked.
+async def quit_driver(my_driver):
+    try:
+        await asyncio.wait_for(my_driver.quit(), 30)
+    except:
+        my_driver.disconnect()
+    await asyncio.get_running_loop().run_in_executor(None, process_groups.kill_browser, get_user_data_dir(my_driver.capabilities))
+
+
+## If JSR is active and set to level 3, open page without XMLHttpRequest and clear logs from previous loaded page.
+async def clear_console_logs(my_driver, jsr_level):
+    if jsr_level == 3:
+        await my_driver.get(fixture_server.get_fixture_page_url('test.html'))
+        await my_driver.get_log('browser')
+
+
+## Load website in given browser. If website is not loaded until page load timeout, stop loading
+#  and continue with the part of website which was already loaded.
+#  Raise NavigationError when browser shows its error page instead of website.
+async def load_page(my_driver, site):
+    try:
+        await my_driver.get('http://www.' + site)
+    except WebDriverCommandError as e:
+        if e.error != 'timeout':
+            raise
+        print("Page load timeout expired, loading of page was stopped: " + site)
+        await my_driver.execute_script("window.stop();")
+    page_errors.check_navigation_error(await my_driver.execute_script(page_errors.NAVIGATION_ERROR_SCRIPT))
+
+
+## Read DevTools events recorded in performance log of browser since the last reading.
+async def get_devtools_events(my_driver):
+    return devtools.parse_devtools_events(await my_driver.get_log('performance'))
+
+
+## Wait until loaded page settles (network is idle), but at most page_settle_timeout seconds.
+#  See devtools.wait_for_network_idle.
+async def wait_for_network_idle(my_driver, events):
+    network_activity = devtools.NetworkActivity()
+    deadline = monotonic() + Config.page_settle_timeout
+    while True:
+        new_events = await get_devtools_events(my_driver)
+        events.extend(new_events)
+        network_activity.update(new_events)
+        if network_activity.is_idle() or monotonic() >= deadline:
+            break
+        await asyncio.sleep(0.1)
+
+
+## Enable collecting of runtime metrics in browser, see devtools.enable_performance_metrics.
+async def enable_performance_metrics(my_driver, browser_type):
+    try:
+        await my_driver.execute_cdp_command('Performance.enable', {})
+    except WebDriverCommandError:
+        print("Performance metrics are not supported by browser: " + str(browser_type))
+
+
+## Read current values of runtime metrics, see devtools.get_performance_metrics.
+async def get_performance_metrics(my_driver):
+    return devtools.parse_performance_metrics(await my_driver.execute_cdp_command('Performance.getMetrics', {}))
+
+
+## Read DevTools metrics before loading of page, see page_performance.get_metrics_before_load.
+async def get_metrics_before_load(my_driver, site):
+    try:
+        return await get_performance_metrics(my_driver)
+    except Exception:
+        print("An exception occurred while getting page performance metrics: " + site)
+        return None
+
+
+## Get performance data of loaded page, see page_performance.get_page_performance.
+async def get_page_performance(my_driver, metrics_before):
+    metrics_after = None
+    if metrics_before is not None:
+        metrics_after = await get_performance_metrics(my_driver)
+    navigation_entry = await my_driver.execute_script(page_performance.NAVIGATION_TIMING_SCRIPT)
+    paint_entries = await my_driver.execute_script(page_performance.PAINT_TIMING_SCRIPT)
+    return page_performance.build_performance_data(navigation_entry, paint_entries, metrics_before, metrics_after)
+
+
+## Count JS dialogs which were opened (and automatically accepted) in browser according to given DevTools events
+#  and events recorded since the last reading.
+async def count_dismissed_dialogs(my_driver, events, site):
+    try:
+        return devtools.count_opened_dialogs(events + await get_devtools_events(my_driver))
+    except Exception:
+        print("An exception occurred while counting dismissed dialogs: " + site)
+        return None
+
+
+## Load website in given browser and get data (log, screenshot and performance) from browser when website is loaded.
+#  Data are taken as soon as the page settles (its network is idle). Duration of every phase is measured by given timer.
+#  Screenshot is written to disk by given screenshot writer and page loaded without JSR is saved to baseline cache.
+#  Errors are recorded by given error recorder with their types, see page_data_builder.
+async def get_page_data(my_driver, browser_type, jsr_level, site, site_number, timer, screenshot_writer, recorder):
+    builder = PageDataBuilder(site, site_number, browser_type, jsr_level, timer, recorder)
+    browser_version = my_driver.capabilities.get('browserVersion', my_driver.capabilities.get('version'))
+    try:
+        with timer.measure('console_clear'):
+            await clear_console_logs(my_driver, jsr_level)
+        if builder.takes_performance:
+            with timer.measure('performance_fetch'):
+                builder.metrics_before = await get_metrics_before_load(my_driver, site)
+        with timer.measure('page_load'):
+            await load_page(my_driver, site)
+        with timer.measure('page_settle'):
+            await wait_for_network_idle(my_driver, builder.events)
+    except Exception as exception:
+        builder.loading_failed(exception)
+    else:
+        if builder.takes_logs:
+            try:
+                with timer.measure('log_fetch'):
+                    builder.logs = await my_driver.get_log('browser')
+            except Exception as exception:
+                builder.log_fetch_failed(exception)
+        if builder.takes_screenshot:
+            try:
+                with timer.measure('screenshot'):
+                    builder.screenshot = (await my_driver.execute_cdp_command('Page.captureScreenshot', screenshots.get_capture_params()))['data']
+            except Exception as exception:
+                builder.screenshot_failed(exception)
+        if builder.takes_performance:
+            try:
+                with timer.measure('performance_fetch'):
+                    builder.performance = await get_page_performance(my_driver, builder.metrics_before)
+            except Exception as exception:
+                builder.performance_failed(exception)
+    page_data = builder.build(await count_dismissed_dialogs(my_driver, builder.events, site), browser_version)
+    builder.save(page_data, screenshot_writer)
+    return page_data
+
+
+## BrowserSession object keeps one browser session which is recreated when it fails.
+#  Browser is driven by WebDriver server given by URL (Selenium Grid server or local chromedriver).
+#  Screenshots are written to disk by given screenshot writer.
+class BrowserSession:
+    def __init__(self, browser_type, with_jsr, jsr_level, command_executor_url, screenshot_writer):
+        self.browser_type = browser_type
+        self.with_jsr = with_jsr
+        self.jsr_level = jsr_level
+        self.command_executor_url = command_executor_url
+        self.screenshot_writer = screenshot_writer
+        self.recycler = BrowserRecycler(browser_type, with_jsr, jsr_level)
+        self.driver = None
+
+    async def start(self):
+        self.driver = await create_driver(self.browser_type, self.with_jsr, self.jsr_level, self.command_executor_url)
+        self.recycler.start_session()
+
+    async def stop(self):
+        if self.driver is not None:
+            await quit_driver(self.driver)
+        self.driver = None
+
+    ## Record site to browser recycler and test if session should be recycled. RSS of browser is measured
+    #  in thread pool, so event loop is not blocked. Site is recorded without RSS when session does not run.
+    async def record_site(self, site_number):
+        capabilities = self.driver.capabilities if self.driver is not None else {}
+        return await asyncio.get_running_loop().run_in_executor(None, self.recycler.record_site, site_number, capabilities)
+
+    ## Get version of browser of this session. Session is started first if it does not run.
+    #  Return None if session cannot be started, it is started again with the next site.
+    async def get_browser_version(self):
+        try:
+            if self.driver is None:
+                await self.start()
+        except Exception:
+            print("An exception occurred while starting browser session: " + str(self.browser_type))
+            return None
+        return self.driver.capabilities.get('browserVersion', self.driver.capabilities.get('version'))
+
+    ## Try to get data of one site until given deadline. Session is started first if it does not run.
+    #  Any exception is recorded as error of the page, so one page never stops the controller.
+    async def try_get_page_data(self, site, site_number, timer, recorder, deadline):
+        try:
+            if self.driver is None:
+                with timer.measure('driver_creation'):
+                    await self.start()
+        except Exception as exception:
+            print("An exception occurred while starting browser session: " + site)
+            recorder.add(PageError.SESSION_START_FAILED, 'driver_creation', exception)
+            return build_error_page_data(timer.timings, recorder.errors)
+        try:
+            with timer.measure('total'):
+                return await asyncio.wait_for(get_page_data(self.driver, self.browser_type, self.jsr_level, site, site_number, timer, self.screenshot_writer, recorder), deadline - time())
+        except asyncio.TimeoutError:
+            print("Getting data of page timed out: " + site)
+            recorder.add(PageError.WORKER_TIMEOUT, timer.phase)
+            return build_error_page_data(timer.timings, recorder.errors)
+        except Exception as exception:
+            print("An exception occurred while getting data of page: " + site)
+            recorder.add(page_errors.classify_error(exception), timer.phase, exception)
+            return build_error_page_data(timer.timings, recorder.errors)
+
+    ## Get data of one site with deadline get_page_data_timeout. Failed attempt is retried according to retry policy
+    #  of its error type. Only this session is recreated, and only after errors which break it or when browser
+    #  should be recycled according to browser recycler. Every site, failed too, is recorded to browser recycler.
+    #  Given time (in seconds) which the site waited in queue of sites is added to its timings.
+    async def get_page_data(self, site, site_number, queue_wait):
+        timer = PhaseTimer()
+        timer.add('queue_wait', queue_wait)
+        recorder = page_errors.ErrorRecorder()
+        deadline = time() + Config.get_page_data_timeout
+        while True:
+            recorder.start_attempt()
+            page_data = await self.try_get_page_data(site, site_number, timer, recorder, deadline)
+            page_error = recorder.get_attempt_error()
+            retry_delay = page_errors.get_retry_delay(page_error, recorder.attempts, deadline)
+            if retry_delay is None:
+                break
+            if page_error is not None and page_errors.is_session_broken(page_error):
+                await self.stop()
+            print("Getting data of page is retried in " + str(retry_delay) + " s: " + site)
+            with timer.measure('retry_backoff'):
+                await asyncio.sleep(retry_delay)
+        recycle = await self.record_site(site_number)
+        if recycle or (page_error is not None and page_errors.is_session_broken(page_error)):
+            await self.stop()
+        return page_data
+
+
+## Control getting data from one browser type. Coroutine takes sites from queue until it is drained.
+#  In distributed testing (no queue is given), sites are leased from coordinator and logs are sent to it.
+#  Every site is loaded without JSR and on every JSR level at the same time, page loaded without JSR is shared by all levels.
+#  Page is not loaded without JSR when it is found in baseline cache for the version of tested browser.
+#  Version of tested browser is taken from the first session with JSR before the first site. Browser sessions are started
+#  by their first site, so session without JSR is started only when a site is not found in cache.
+#  Events about tested sites are sent to queue of metrics collector.
+async def testing_controller(thread_mark, browser_type, site_queue, top_sites_number, events):
+    screenshot_writer = screenshots.ScreenshotWriter()
+    command_executor_url = local_drivers.get_command_executor_url(thread_mark)
+    session_without_jsr = BrowserSession(browser_type, with_jsr=False, jsr_level=None, command_executor_url=command_executor_url, screenshot_writer=screenshot_writer)
+    sessions_with_jsr = [BrowserSession(browser_type, with_jsr=True, jsr_level=jsr_level, command_executor_url=command_executor_url, screenshot_writer=screenshot_writer)
+                         for jsr_level in Config.jsr_levels]
+    client = coordinator.CoordinatorClient(browser_type) if site_queue is None else None
+    logs_part = io.open_logs_part(thread_mark, browser_type) if client is None else None
+    store = results_store.open_store() if client is None else None
+    browser_version = None
+    try:
+        if Config.use_baseline_cache:
+            browser_version = await sessions_with_jsr[0].get_browser_version()
+        while True:
+            site_job = await get_site_job(client, site_queue)
+            if site_job is None:
+                break
+            site_number, top_site, queued_time = site_job
+            queue_wait = time() - queued_time
+            print("Coroutine " + thread_mark + ": " + str(browser_type) + ": Page with rank " + str(site_number) + " (" + str(top_sites_number) + " sites to test): " + top_site)
+
+            page_data_without_jsr = baseline_cache.load_page_data(top_site, site_number, browser_type, browser_version)
+            getting_page_data = [session_with_jsr.get_page_data(top_site, site_number, queue_wait) for session_with_jsr in sessions_with_jsr]
+            if page_data_without_jsr is None:
+                getting_page_data.append(session_without_jsr.get_page_data(top_site, site_number, queue_wait))
+            site_start = monotonic()
+            metrics.record_site_started(events, thread_mark, browser_type, len(getting_page_data))
+            pages_data = await asyncio.gather(*getting_page_data)
+
+            if page_data_without_jsr is None:
+                page_data_without_jsr = pages_data.pop()
+            site_logs = []
+            for session_with_jsr, page_data_with_jsr in zip(sessions_with_jsr, pages_data):
+                browser_version = page_data_with_jsr.browser_version or browser_version
+                site_logs.append(Logs(top_site, site_number, browser_type, session_with_jsr.jsr_level, page_data_without_jsr, page_data_with_jsr))
+            await asyncio.get_running_loop().run_in_executor(None, coordinator.save_site_logs, client, logs_part, store, site_logs)
+            metrics.record_site_finished(events, thread_mark, browser_type, command_executor_url, monotonic() - site_start, site_logs)
+    finally:
+        if logs_part is not None:
+            logs_part.close()
+            store.close()
+        await asyncio.gather(session_without_jsr.stop(), *[session_with_jsr.stop() for session_with_jsr in sessions_with_jsr])
+        screenshot_writer.close()
+
+
+## Get the next site to test as tuple (site_number, site, time of queueing), or None when all sites are tested.
+#  Site is taken from queue, or leased from coordinator (without blocking event loop) in distributed testing.
+async def get_site_job(client, site_queue):
+    if client is not None:
+        return await asyncio.get_running_loop().run_in_executor(None, client.get)
+    if site_queue.empty():
+        return None
+    return site_queue.get_nowait()
+
+
+## Start testing controllers for all browser types in one event loop. Controllers share queues of sites to test.
+#  Sites are given as tuples (rank, site), rank is used as site number. Sites already completed according to journal are skipped.
+#  In distributed testing, no sites are given and every controller leases sites from coordinator.
+#  Controllers send events about tested sites to given metrics collector.
+#  Controller which ends with an exception does not stop the other ones, like a controller process of process engine.
+async def run_testing_controllers(numbered_sites, collector):
+    completed_units = journal.read_completed_units()
+    top_sites_number = len(numbered_sites) if numbered_sites is not None else coordinator.get_sites_number()
+    controllers = []
+    for browser_type in Config.tested_browsers:
+        site_queue = None
+        if numbered_sites is not None:
+            site_queue = asyncio.Queue()
+            unfinished_sites = journal.get_unfinished_sites(numbered_sites, completed_units, browser_type, Config.jsr_levels)
+            collector.set_queued_sites(browser_type, len(unfinished_sites))
+            queued_time = time()
+            for site_number, site in unfinished_sites:
+                site_queue.put_nowait((site_number, site, queued_time))
+        thread_mark = 'A'
+        for _ in range(Config.number_of_concurrent_sites_testing):
+            controllers.append(testing_controller(thread_mark, browser_type, site_queue, top_sites_number, collector.events))
+            thread_mark = chr(ord(thread_mark) + 1)
+    results = await asyncio.gather(*controllers, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            print("Testing controller ended with an exception: " + repr(result))
+
+
+## Get data from browsers by asyncio engine. Events about tested sites are sent to given metrics collector.
+def run_getting_logs(collector):
+    if not Config.perform_tests:
+        print("'perform_tests' property in Configuration is empty. No test to perform.")
+    else:
+        top_sites = sites.read_sites_for_testing() if Config.coordinator_address is None else None
+        asyncio.run(run_testing_controllers(top_sites, collector))
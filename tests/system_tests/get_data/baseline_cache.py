@@ -0,0 +1,110 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+## Cache of pages loaded without JSR allows to reuse them in later testing, when only JSR changes between testings.
+#
+#  Every entry is stored in folder given by browser, browser version and site and contains page data obtained
+#  without JSR (logs, dialogs, timings, performance), date of capture and screenshot. Screenshot is written to cache
+#  by screenshot writer together with screenshot in output folder and page data are saved only after it is written,
+#  see page_data_builder.
+#  Entry is used only when it is not older than baseline_cache_max_age_days and contains data of all performed tests.
+
+from os import path, replace
+from shutil import copyfile
+from datetime import date
+from json import dumps, loads
+
+from configuration import Config
+from test_type import TestType
+from website import PageData
+import io_funcs as io
+import screenshots
+
+
+CACHE_PATH = "../data/baseline_cache"
+
+
+## Get folder of cache entry of given site tested in given browser version.
+def get_entry_path(site, browser_type, browser_version):
+    return CACHE_PATH + "/" + str(browser_type) + "/" + browser_version + "/" + site
+
+
+## Get path of cached screenshot of given site loaded without JSR in given browser version.
+def get_cached_screenshot_path(site, browser_type, browser_version):
+    return get_entry_path(site, browser_type, browser_version) + "/without_jsr" + screenshots.get_file_extension()
+
+
+## Test if page data obtained without JSR can be saved to cache, i.e. cache is used, version of browser is known
+#  and page was loaded without error.
+def is_cacheable(page_data):
+    return Config.use_baseline_cache and page_data.browser_version is not None and page_data.logs != "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE"
+
+
+## Test if cache entry was captured in freshness window and contains data of all performed tests.
+def is_entry_fresh(entry, cached_screenshot_path):
+    if (date.today() - date.fromisoformat(entry["capture_date"])).days > Config.baseline_cache_max_age_days:
+        return False
+    if TestType.LOGS in Config.perform_tests and entry["logs"] is None:
+        return False
+    if TestType.PERFORMANCE in Config.perform_tests and entry["performance"] is None:
+        return False
+    if TestType.SCREENSHOTS in Config.perform_tests and not path.isfile(cached_screenshot_path):
+        return False
+    return True
+
+
+## Load page data of given site obtained without JSR from cache. Screenshot is copied to output folder of screenshots.
+#  Return None if cache is not used, browser version is not known yet or there is no fresh entry of the site.
+def load_page_data(site, site_number, browser_type, browser_version):
+    if not Config.use_baseline_cache or browser_version is None:
+        return None
+    entry_path = get_entry_path(site, browser_type, browser_version)
+    cached_screenshot_path = get_cached_screenshot_path(site, browser_type, browser_version)
+    try:
+        with open(entry_path + "/page_data.json", 'r', newline='', encoding='utf-8') as f:
+            entry = loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if not is_entry_fresh(entry, cached_screenshot_path):
+        return None
+    if TestType.SCREENSHOTS in Config.perform_tests:
+        io.create_folder_structure("../data/screenshots/" + str(site_number) + "_" + site)
+        copyfile(cached_screenshot_path, screenshots.get_screenshot_path(site, site_number, "without_jsr"))
+    page_data = PageData(entry["logs"], entry["dialogs_dismissed"], entry["timings"], entry["performance"])
+    page_data.browser_version = browser_version
+    page_data.capture_date = entry["capture_date"]
+    return page_data
+
+
+## Save page data of given site obtained without JSR to cache. Only page data obtained without error are saved.
+#  When screenshots are tested, it is called only after screenshot of page is written to cache.
+#  Entry is written to temporary file first, so interrupted saving does not leave broken entry.
+def save_page_data(site, browser_type, page_data):
+    if not is_cacheable(page_data):
+        return
+    entry_path = get_entry_path(site, browser_type, page_data.browser_version)
+    io.create_folder_structure(entry_path)
+    logs = page_data.logs if TestType.LOGS in Config.perform_tests else None
+    entry = {"site": site, "browser": str(browser_type), "browser_version": page_data.browser_version, "capture_date": date.today().isoformat(),
+             "logs": logs, "dialogs_dismissed": page_data.dialogs_dismissed, "timings": page_data.timings, "performance": page_data.performance}
+    with open(entry_path + "/page_data.json.tmp", 'w', newline='', encoding='utf-8') as f:
+        f.write(dumps(entry))
+    replace(entry_path + "/page_data.json.tmp", entry_path + "/page_data.json")
@@ -0,0 +1,97 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+## Browser sessions are recycled (recreated) between sites after given number of sites or when resident set size (RSS)
+#  of browser process tree exceeds given limit, so memory of long-lived browsers does not grow without limit.
+#
+#  RSS is measured by optional package psutil, only for browsers running on this device. Process of browser is found
+#  by its user data directory reported by chromedriver in capabilities of session.
+
+from os import getpid, path
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from configuration import Config
+import io_funcs as io
+
+
+## Get user data directory of Chrome from capabilities of its session.
+def get_user_data_dir(capabilities):
+    return capabilities.get('chrome', {}).get('userDataDir')
+
+
+## Get RSS (in MB) of process tree of browser with given user data directory.
+#  Return None if psutil is not installed or browser does not run on this device.
+def get_browser_rss(user_data_dir):
+    if psutil is None or user_data_dir is None:
+        return None
+    for process in psutil.process_iter(['cmdline']):
+        cmdline = process.info['cmdline'] or []
+        if '--user-data-dir=' + user_data_dir in cmdline and not any(argument.startswith('--type=') for argument in cmdline):
+            rss = 0
+            try:
+                processes = [process] + process.children(recursive=True)
+            except psutil.Error:
+                return None
+            for browser_process in processes:
+                try:
+                    rss += browser_process.memory_info().rss
+                except psutil.Error:
+                    pass
+            return round(rss / 2 ** 20, 1)
+    return None
+
+
+## BrowserRecycler object decides when browser session should be recycled and exports RSS of browser measured after
+#  every site to CSV file, one file for every browser of every process (columns: session, sites_in_session, site_number, rss_mb).
+#  Failed sites are recorded too, RSS is empty when browser does not run.
+class BrowserRecycler:
+    def __init__(self, browser_type, with_jsr, jsr_level):
+        jsr = "without_jsr"
+        if with_jsr:
+            jsr = "with_jsr_level_" + str(jsr_level)
+        self.rss_csv_path = "../data/logs/rss_" + str(browser_type) + "_" + jsr + "_" + str(getpid()) + ".csv"
+        self.session_number = 0
+        self.sites_in_session = 0
+
+    ## Start counting sites of a new browser session.
+    def start_session(self):
+        self.session_number += 1
+        self.sites_in_session = 0
+
+    ## Record site loaded in the current session with given capabilities and test if session should be recycled
+    #  before the next site.
+    def record_site(self, site_number, capabilities):
+        self.sites_in_session += 1
+        rss = get_browser_rss(get_user_data_dir(capabilities))
+        if not path.isfile(self.rss_csv_path):
+            io.append_file(self.rss_csv_path, "session,sites_in_session,site_number,rss_mb\n")
+        io.append_file(self.rss_csv_path, str(self.session_number) + "," + str(self.sites_in_session) + "," + str(site_number) + "," + ("" if rss is None else str(rss)) + "\n")
+        if Config.recycle_browser_after_sites and self.sites_in_session >= Config.recycle_browser_after_sites:
+            print("Browser session is recycled after " + str(self.sites_in_session) + " sites.")
+            return True
+        if Config.recycle_browser_rss_limit and rss is not None and rss > Config.recycle_browser_rss_limit:
+            print("Browser session is recycled, RSS of browser is " + str(rss) + " MB.")
+            return True
+        return False
@@ -21,6 +21,12 @@
 
 from web_browser_type import BrowserType
 from test_type import TestType
+from crawler_engine import CrawlerEngine
+from web_replay_mode import WebReplayMode
+from screenshot_format import ScreenshotFormat
+from driver_mode import DriverMode
+from sites_sampling import SitesSampling
+from page_error import PageError
 
 ## Static MetaConfig class contains declaration of basic variables used during testing.
 class MetaConfig(type):
@@ -31,33 +37,156 @@ class MetaConfig(type):
     def number_of_sites_for_testing(self):
         return self._number_of_sites_for_testing
     @property
+    def sites_rank_range(self):
+        return self._sites_rank_range
+    @property
+    def sites_sampling(self):
+        return self._sites_sampling
+    @property
+    def sites_sampling_seed(self):
+        return self._sites_sampling_seed
+    @property
+    def excluded_sites_paths(self):
+        return self._excluded_sites_paths
+    @property
     def tested_browsers(self):
         return self._tested_browsers
     @property
-    def jsr_level(self):
-        return self._jsr_level
+    def jsr_levels(self):
+        return self._jsr_levels
     @property
     def perform_tests(self):
         return self._perform_tests
     @property
+    def crawler_engine(self):
+        return self._crawler_engine
+    @property
+    def resume_interrupted_testing(self):
+        return self._resume_interrupted_testing
+    @property
+    def use_baseline_cache(self):
+        return self._use_baseline_cache
+    @property
+    def baseline_cache_max_age_days(self):
+        return self._baseline_cache_max_age_days
+    @property
+    def recycle_browser_after_sites(self):
+        return self._recycle_browser_after_sites
+    @property
+    def recycle_browser_rss_limit(self):
+        return self._recycle_browser_rss_limit
+    @property
+    def driver_mode(self):
+        return self._driver_mode
+    @property
+    def local_driver_first_port(self):
+        return self._local_driver_first_port
+    @property
+    def coordinator_address(self):
+        return self._coordinator_address
+    @property
+    def coordinator_port(self):
+        return self._coordinator_port
+    @property
+    def coordinator_lease_timeout(self):
+        return self._coordinator_lease_timeout
+    @property
     def grid_server_ip_address(self):
         return self._grid_server_ip_address
     @property
     def number_of_grid_nodes_on_this_device(self):
         return self._number_of_grid_nodes_on_this_device
     @property
+    def grid_node_ip_address(self):
+        return self._grid_node_ip_address
+    @property
+    def grid_first_node_port(self):
+        return self._grid_first_node_port
+    @property
+    def grid_startup_timeout(self):
+        return self._grid_startup_timeout
+    @property
     def number_of_concurrent_sites_testing(self):
         return self._number_of_concurrent_sites_testing
     @property
+    def metrics_port(self):
+        return self._metrics_port
+    @property
+    def fixture_server_address(self):
+        return self._fixture_server_address
+    @property
+    def fixture_server_port(self):
+        return self._fixture_server_port
+    @property
+    def web_replay_mode(self):
+        return self._web_replay_mode
+    @property
+    def web_replay_address(self):
+        return self._web_replay_address
+    @property
+    def web_replay_http_port(self):
+        return self._web_replay_http_port
+    @property
+    def web_replay_https_port(self):
+        return self._web_replay_https_port
+    @property
+    def web_replay_certificate_spki(self):
+        return self._web_replay_certificate_spki
+    @property
     def get_page_data_timeout(self):
         return self._get_page_data_timeout
     @property
-    def wait_between_checks_if_page_data_loaded(self):
-        return self._wait_between_checks_if_page_data_loaded
+    def page_load_timeout(self):
+        return self._page_load_timeout
+    @property
+    def page_error_retries(self):
+        return self._page_error_retries
+    @property
+    def page_error_retry_backoff(self):
+        return self._page_error_retry_backoff
+    @property
+    def page_settle_timeout(self):
+        return self._page_settle_timeout
+    @property
+    def network_idle_time(self):
+        return self._network_idle_time
+    @property
+    def network_idle_max_pending_requests(self):
+        return self._network_idle_max_pending_requests
+    @property
+    def screenshot_viewport_size(self):
+        return self._screenshot_viewport_size
+    @property
+    def screenshot_device_scale_factor(self):
+        return self._screenshot_device_scale_factor
+    @property
+    def screenshot_scale(self):
+        return self._screenshot_scale
+    @property
+    def screenshot_grayscale(self):
+        return self._screenshot_grayscale
+    @property
+    def screenshot_format(self):
+        return self._screenshot_format
+    @property
+    def screenshot_jpeg_quality(self):
+        return self._screenshot_jpeg_quality
     @property
     def selenium_server_jar_path(self):
         return self._selenium_server_jar_path
     @property
+    def fixture_pages_path(self):
+        return self._fixture_pages_path
+    @property
+    def wpr_directory_path(self):
+        return self._wpr_directory_path
+    @property
+    def wpr_path(self):
+        return self._wpr_path
+    @property
+    def web_replay_archive_path(self):
+        return self._web_replay_archive_path
+    @property
     def chrome_driver_path(self):
         return self._chrome_driver_path
     @property
@@ -69,28 +198,130 @@ class MetaConfig(type):
 class Config(metaclass=MetaConfig):
     # Relative or absolute path to top sites csv file.
     _sites_to_test_csv_path = './top_sites/tranco.csv'
-    # Number of sites from beggining of the top sites list taken for testing.
+    # Number of sites from the top sites list taken for testing.
     _number_of_sites_for_testing = 100
+    # Range of ranks (first, last) in the top sites list from which sites are taken, e.g. (10001, 20000).
+    # None means the whole list. Rank of site is used as its number, so testing can be split across devices by ranges.
+    _sites_rank_range = None
+    # Selecting sites from rank range: SitesSampling.TOP (the best ranked sites), SitesSampling.RANDOM (random sites)
+    # or SitesSampling.STRATIFIED (one random site from every of equally large parts of range).
+    _sites_sampling = SitesSampling.TOP
+    # Seed of random sampling, the same seed selects the same sites.
+    _sites_sampling_seed = 0
+    # Paths to lists of sites (one per line) which are never tested.
+    _excluded_sites_paths = []
     # Run tests in this browsers.
     _tested_browsers = [BrowserType.CHROME]
-    # Run tests with JSR on this level.
-    _jsr_level = 3
+    # Run tests with JSR on these levels. Every site is loaded once without JSR and once on every level in parallel,
+    # so all levels are compared with the same page loaded without JSR.
+    _jsr_levels = [3]
     # Perform this tests for every website.
+    # TestType.PERFORMANCE measures page load overhead of JSR (Navigation Timing, paint timings and DevTools metrics).
     _perform_tests = [TestType.LOGS, TestType.SCREENSHOTS]
+    # Engine driving browsers: CrawlerEngine.PROCESSES (process per browser session)
+    # or CrawlerEngine.ASYNCIO (all browser sessions in one event loop).
+    _crawler_engine = CrawlerEngine.PROCESSES
+    # Resume interrupted testing. Sites completed before interruption (according to journal) are not tested again.
+    # Set to False to delete results of previous testing and start from the beginning.
+    _resume_interrupted_testing = True
+    # Reuse pages loaded without JSR in previous testings (logs, screenshot, timings) from baseline cache.
+    # Only browsers with JSR are driven for sites found in cache for the same browser version.
+    _use_baseline_cache = False
+    # Pages in baseline cache older than this number of days are loaded without JSR again.
+    _baseline_cache_max_age_days = 7
+
+    # Browser session is recreated between sites after this number of sites (None to never recreate it).
+    _recycle_browser_after_sites = 500
+    # Browser session is recreated between sites when RSS of its processes exceeds this limit in MB (None for no limit).
+    # RSS can be measured only for browsers on this device and it needs Python package psutil.
+    # RSS of every browser after every site is saved to ./data/logs/rss_*.csv.
+    _recycle_browser_rss_limit = 2048
+
+    # Mode of driving browsers: DriverMode.GRID (through Selenium Grid, also on more devices)
+    # or DriverMode.LOCAL (directly by local chromedriver processes, without Selenium Grid, on this device only).
+    _driver_mode = DriverMode.GRID
+    # Local chromedrivers (one for every concurrent testing) listen on consecutive ports starting with this one.
+    _local_driver_first_port = 9515
+
+    # Address of coordinator of distributed testing (start_coordinator.py). When it is set, this device is a worker:
+    # it tests sites leased by coordinator and sends results to it instead of saving them to ./data/logs.
+    # Only one worker per device is supported, workers on the same device would kill browsers of each other.
+    _coordinator_address = None
+    _coordinator_port = 8090
+    # Site leased to worker is leased again to another worker when results are not sent in this number of seconds.
+    # It should be higher than get_page_data_timeout.
+    _coordinator_lease_timeout = 600
 
     # IP address of Selenium Grid server in distributed environment.
     _grid_server_ip_address = 'localhost'
     # Number of Selenium Grid nodes on this device.
     _number_of_grid_nodes_on_this_device = 1
+    # IP address of Grid nodes on this device. In distributed environment, use address of this device reachable
+    # from Selenium Grid server. Nodes are registered to server by this address.
+    _grid_node_ip_address = 'localhost'
+    # Grid nodes on this device listen on consecutive ports starting with this one.
+    _grid_first_node_port = 5555
+    # Selenium Grid server and nodes are started at the same time. Testing starts as soon as all of them are ready,
+    # but if they are not ready in this number of seconds, testing is not started. The same timeout applies to local chromedrivers.
+    _grid_startup_timeout = 120
     # Degree of paralelism. It should be the same number as total number of grid nodes.
     _number_of_concurrent_sites_testing = 1
+    # Port of local HTTP endpoint with live metrics of testing (http://localhost:<port>/metrics) in Prometheus text format.
+    # Endpoint is bound to localhost only. It is disabled by None, set a free port (e.g. 9100) to enable it.
+    _metrics_port = None
+    # Address and port of local HTTP server serving JSR test pages to browsers (e.g. for clearing console logs).
+    # In distributed environment, use address of this device reachable from all Grid nodes.
+    _fixture_server_address = 'localhost'
+    _fixture_server_port = 8000
+
+    # Web Page Replay mode: WebReplayMode.OFF (load sites from the internet), WebReplayMode.RECORD (record traffic
+    # of loaded sites to archive) or WebReplayMode.REPLAY (load sites from archive recorded before, works offline).
+    _web_replay_mode = WebReplayMode.OFF
+    # Address and ports of Web Page Replay. In distributed environment, use address of this device reachable from all Grid nodes.
+    _web_replay_address = '127.0.0.1'
+    _web_replay_http_port = 8080
+    _web_replay_https_port = 8081
+    # SPKI fingerprint of certificate used by Web Page Replay (default is fingerprint of wpr_cert.pem distributed with wpr).
+    _web_replay_certificate_spki = 'PhrPvGIaAMmd29hj8BCZOq096yj7uMpRNHpn5PDxI6I='
 
     # Timeout during loading one site in seconds.
     _get_page_data_timeout = 240
-    # Waiting in seconds between checking website if is alreadz loaded.
-    _wait_between_checks_if_page_data_loaded = 10
+    # Timeout of loading page in browser in seconds. When it expires, page loading is stopped and data are taken
+    # from already loaded part of page. It should be lower than get_page_data_timeout.
+    _page_load_timeout = 120
+    # Number of retries of getting data of page after error of given type. Browser session is rebuilt before retry
+    # only after errors which break it (renderer crash, lost session). Errors of other types are not retried.
+    _page_error_retries = {PageError.NAVIGATION_FAILED: 1, PageError.NAVIGATION_TIMEOUT: 1, PageError.RENDERER_CRASH: 1,
+                           PageError.SESSION_LOST: 1, PageError.SESSION_START_FAILED: 1, PageError.LOADING_FAILED: 1}
+    # Delay before the first retry in seconds, it is doubled before every next retry. Page is retried only when one more
+    # whole attempt (page load and settle timeouts, other steps and new browser session if needed) fits into get_page_data_timeout.
+    _page_error_retry_backoff = 2
+    # After page is loaded, logs and screenshot are taken as soon as page settles: it has at most
+    # network_idle_max_pending_requests pending requests (e.g. long polling) and no network activity
+    # for network_idle_time seconds. Waiting for page to settle takes at most page_settle_timeout seconds.
+    # When page_settle_timeout is 0, page is not waited for and Network events are not recorded in performance log.
+    _page_settle_timeout = 10
+    _network_idle_time = 0.5
+    _network_idle_max_pending_requests = 2
+
+    # Size of viewport (width, height) in CSS pixels and device scale factor emulated in all browsers, so screenshots
+    # have the same size on every Grid node. Set size to None to keep viewport of maximized browser window.
+    _screenshot_viewport_size = (1366, 768)
+    _screenshot_device_scale_factor = 1
+    # Screenshots are downscaled by this factor (e.g. 0.5 for half width and height). It works only with fixed viewport.
+    _screenshot_scale = 1
+    # Save screenshots in grayscale.
+    _screenshot_grayscale = False
+    # Format of screenshots: ScreenshotFormat.PNG (lossless) or ScreenshotFormat.JPEG (fast lossy encoding).
+    _screenshot_format = ScreenshotFormat.PNG
+    # Quality of JPEG screenshots (0-100).
+    _screenshot_jpeg_quality = 80
 
     # Paths to files neccessary for testing.
     _selenium_server_jar_path = './selenium/selenium-server-standalone.jar'
+    _fixture_pages_path = '../../../docs/test'
+    _wpr_directory_path = './web_page_replay_go'
+    _wpr_path = './web_page_replay_go/wpr'
+    _web_replay_archive_path = '../data/web_replay/archive.wprgo'
     _chrome_driver_path = '../../common_files/webbrowser_drivers/chromedriver.exe'
     _jsr_extension_for_chrome_path = '../../common_files/JSR/chrome_JSR.crx'
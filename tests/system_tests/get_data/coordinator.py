@@ -0,0 +1,241 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+## Coordinator of distributed testing hands out sites to independent crawler workers on more devices.
+#
+#  Coordinator is a HTTP service with JSON API. Worker asks for a lease of a site for its browser type, tests the site
+#  and sends back logs records of all JSR levels. Lease which is not finished until lease timeout expires (e.g. worker
+#  crashed) is issued again to another worker. Results are deduplicated by key (site, browser, JSR level),
+#  the same key as units of journal and records merged to logs, so a late result of expired lease, a result sent twice
+#  or a result of unit completed before interruption is saved only once (completed result is preferred).
+#  Accepted records are saved to logs part of coordinator and to results store and recorded to journal,
+#  so interrupted coordination can be resumed.
+
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Thread, Lock, Event
+from json import dumps, loads
+from urllib.request import urlopen, Request
+from urllib.error import URLError
+from time import sleep, time, monotonic
+from uuid import uuid4
+
+from configuration import Config
+import io_funcs as io
+import journal
+import results_store
+
+
+## Seconds which worker waits before it asks again for a lease when all unfinished sites are leased.
+RETRY_INTERVAL = 5
+
+
+## Coordinator object keeps queues of sites waiting for testing, active leases and keys of saved results.
+#  Sites are kept as tuples (site_number, site) in separate queue for every browser type.
+class Coordinator:
+    def __init__(self, numbered_sites, completed_units):
+        self.lock = Lock()
+        self.done = Event()
+        self.pending = {}
+        self.leases = {}
+        self.finished = set()
+        self.results = {unit: True for unit in completed_units}
+        self.sites_number = len(numbered_sites)
+        for browser_type in Config.tested_browsers:
+            self.pending[str(browser_type)] = deque(journal.get_unfinished_sites(numbered_sites, completed_units, browser_type, Config.jsr_levels))
+        self.logs_part = io.open_logs_part('coordinator', 'all')
+        self.store = results_store.open_store()
+        self.check_done()
+
+    ## Return leases whose timeout expired to the front of their queues.
+    def expire_leases(self):
+        now = monotonic()
+        for lease_id, (browser, site_job, deadline) in list(self.leases.items()):
+            if deadline <= now:
+                print("Lease of site expired, it is issued again: " + site_job[1])
+                del self.leases[lease_id]
+                self.pending[browser].appendleft(site_job)
+
+    ## Set done event when all sites are finished in all browsers.
+    def check_done(self):
+        if not self.leases and not any(self.pending.values()):
+            self.done.set()
+
+    ## Lease the next unfinished site in given browser. Return response for worker.
+    def lease(self, browser):
+        with self.lock:
+            self.expire_leases()
+            queue = self.pending.get(browser, deque())
+            while queue:
+                site_job = queue.popleft()
+                if (browser, site_job) not in self.finished:
+                    lease_id = uuid4().hex
+                    self.leases[lease_id] = (browser, site_job, monotonic() + Config.coordinator_lease_timeout)
+                    return {'lease_id': lease_id, 'site_number': site_job[0], 'site': site_job[1]}
+            if any(lease_browser == browser for lease_browser, site_job, deadline in self.leases.values()):
+                return {'wait': RETRY_INTERVAL}
+            return {'done': True}
+
+    ## Save logs records of leased site, every result key is saved once. Lease is finished even when it has expired
+    #  and the site was issued again, the later result is deduplicated then.
+    def submit(self, lease_id, browser, site_job, records_json):
+        with self.lock:
+            for record_json in records_json:
+                record = loads(record_json)
+                key = (record['site'], record['browser'], record['jsr_level'])
+                completed = io.is_logs_record_completed(record)
+                if key not in self.results or (completed and not self.results[key]):
+                    self.results[key] = completed
+                    io.write_ndjson_record(self.logs_part, record_json)
+                    results_store.write_record(self.store, record)
+                    journal.record_unit(record['site'], record['browser'], record['jsr_level'], completed)
+            self.leases.pop(lease_id, None)
+            self.finished.add((browser, site_job))
+            self.check_done()
+        return {'accepted': True}
+
+    ## Get state of coordination.
+    def status(self):
+        with self.lock:
+            self.expire_leases()
+            return {'sites': self.sites_number, 'pending': sum(len(queue) for queue in self.pending.values()),
+                    'leased': len(self.leases), 'results': len(self.results)}
+
+    def close(self):
+        self.logs_part.close()
+        self.store.close()
+
+
+## Request handler of coordinator API. Requests and responses are JSON objects.
+#  POST /lease {"browser"} - lease a site, response contains lease_id, site_number and site, or wait (seconds), or done.
+#  POST /result {"lease_id", "browser", "site_number", "site", "records"} - send logs records of leased site.
+#  GET /status - numbers of sites, pending sites, active leases and saved results.
+class CoordinatorRequestHandler(BaseHTTPRequestHandler):
+    coordinator = None
+
+    def send_json(self, response, status=200):
+        body = dumps(response).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/status':
+            self.send_json(self.coordinator.status())
+        else:
+            self.send_json({'error': 'unknown request'}, 404)
+
+    def do_POST(self):
+        try:
+            request = loads(self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8'))
+            if self.path == '/lease':
+                self.send_json(self.coordinator.lease(request['browser']))
+            elif self.path == '/result':
+                site_job = (request['site_number'], request['site'])
+                self.send_json(self.coordinator.submit(request['lease_id'], request['browser'], site_job, request['records']))
+            else:
+                self.send_json({'error': 'unknown request'}, 404)
+        except (ValueError, KeyError, TypeError):
+            self.send_json({'error': 'bad request'}, 400)
+
+    def log_message(self, format, *args):
+        pass
+
+
+## Start coordinator API server in a background thread.
+def start_coordinator_server(coordinator):
+    handler = type('BoundCoordinatorRequestHandler', (CoordinatorRequestHandler,), {'coordinator': coordinator})
+    server = ThreadingHTTPServer(('', Config.coordinator_port), handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+## Stop coordinator API server.
+def end_coordinator_server(server):
+    server.shutdown()
+    server.server_close()
+
+
+## Get URL of coordinator API.
+def get_coordinator_url():
+    return 'http://' + Config.coordinator_address + ':' + str(Config.coordinator_port)
+
+
+## Send request to coordinator and return its JSON response. Request is repeated when coordinator is not reachable,
+#  because it may be restarted. Return None if coordinator is not reachable for the whole lease timeout.
+def request_coordinator(path, request=None):
+    data = dumps(request).encode('utf-8') if request is not None else None
+    deadline = monotonic() + Config.coordinator_lease_timeout
+    while True:
+        try:
+            with urlopen(Request(get_coordinator_url() + path, data=data, headers={'Content-Type': 'application/json'}), timeout=30) as response:
+                return loads(response.read().decode('utf-8'))
+        except (URLError, OSError, ValueError):
+            if monotonic() >= deadline:
+                print("Coordinator is not reachable: " + get_coordinator_url())
+                return None
+            sleep(RETRY_INTERVAL)
+
+
+## Get number of sites tested by all workers.
+def get_sites_number():
+    status = request_coordinator('/status')
+    return status['sites'] if status is not None else 0
+
+
+## CoordinatorClient object takes sites of one browser type from coordinator for one testing controller of worker.
+#  It can be used instead of queue of sites: get returns (site_number, site), or None when all sites are tested.
+class CoordinatorClient:
+    def __init__(self, browser_type):
+        self.browser = str(browser_type)
+        self.lease = None
+
+    ## Lease the next site, wait while all unfinished sites are leased by other workers.
+    #  Return tuple (site_number, site, time of leasing) like queue of sites, or None when all sites are tested.
+    def get(self):
+        while True:
+            response = request_coordinator('/lease', {'browser': self.browser})
+            if response is None or response.get('done'):
+                return None
+            if 'lease_id' in response:
+                self.lease = response
+                return response['site_number'], response['site'], time()
+            sleep(response.get('wait', RETRY_INTERVAL))
+
+    ## Send logs records (JSON strings) of all JSR levels of the last leased site to coordinator.
+    def submit_records(self, records_json):
+        request_coordinator('/result', {'lease_id': self.lease['lease_id'], 'browser': self.browser, 'site_number': self.lease['site_number'],
+                                        'site': self.lease['site'], 'records': records_json})
+
+
+## Save logs of all JSR levels of one site. In distributed testing (client of coordinator is given), logs are sent
+#  to coordinator, otherwise they are written to logs part and results store and recorded to journal.
+def save_site_logs(client, logs_part, store, site_logs):
+    if client is not None:
+        client.submit_records([page_logs.to_json() for page_logs in site_logs])
+    else:
+        for page_logs in site_logs:
+            record_json = page_logs.to_json()
+            io.write_ndjson_record(logs_part, record_json)
+            results_store.write_record(store, loads(record_json))
+            journal.record_unit(page_logs.site, page_logs.browser, page_logs.jsr_level, page_logs.is_completed())
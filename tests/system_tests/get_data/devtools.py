@@ -0,0 +1,111 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from json import loads
+from time import sleep, monotonic
+
+from configuration import Config
+
+
+## Get preferences of performance log for goog:chromeOptions. Only DevTools domains which are read from performance log
+#  are recorded: Page domain for opened JS dialogs and Network domain for detecting that page settled, which is skipped
+#  when page_settle_timeout is 0. Tracing (timeline) events are never recorded.
+def get_perf_logging_prefs():
+    return {'enableNetwork': Config.page_settle_timeout > 0, 'enablePage': True}
+
+
+## Parse DevTools events from entries of performance log.
+#  Every event is returned as dictionary with keys 'method' and 'params'.
+def parse_devtools_events(log_entries):
+    events = []
+    for entry in log_entries:
+        events.append(loads(entry['message'])['message'])
+    return events
+
+
+## Read DevTools events recorded in performance log of browser since the last reading. Reading empties the log.
+def get_devtools_events(my_driver):
+    return parse_devtools_events(my_driver.get_log('performance'))
+
+
+## Count JavaScript dialogs (alert, confirm, prompt, beforeunload) opened in browser according to DevTools events.
+def count_opened_dialogs(events):
+    return len([event for event in events if event['method'] == 'Page.javascriptDialogOpening'])
+
+
+## NetworkActivity object tracks network requests of loaded page according to DevTools events.
+#
+#  Page is considered settled when it has at most network_idle_max_pending_requests pending requests
+#  and no network event occurred for network_idle_time seconds.
+class NetworkActivity:
+    def __init__(self):
+        self.pending_requests = set()
+        self.last_activity = monotonic()
+
+    ## Update state of network activity by new DevTools events.
+    def update(self, events):
+        for event in events:
+            if event['method'] == 'Network.requestWillBeSent':
+                self.pending_requests.add(event['params']['requestId'])
+            elif event['method'] in ('Network.loadingFinished', 'Network.loadingFailed'):
+                self.pending_requests.discard(event['params']['requestId'])
+            if event['method'].startswith('Network.'):
+                self.last_activity = monotonic()
+
+    ## Test if network of page is idle.
+    def is_idle(self):
+        return len(self.pending_requests) <= Config.network_idle_max_pending_requests and monotonic() - self.last_activity >= Config.network_idle_time
+
+
+## Wait until loaded page settles (network is idle), but at most page_settle_timeout seconds.
+#  DevTools events read during waiting are appended to given list of events.
+def wait_for_network_idle(my_driver, events):
+    network_activity = NetworkActivity()
+    deadline = monotonic() + Config.page_settle_timeout
+    while True:
+        new_events = get_devtools_events(my_driver)
+        events.extend(new_events)
+        network_activity.update(new_events)
+        if network_activity.is_idle() or monotonic() >= deadline:
+            break
+        sleep(0.1)
+
+
+## Execute DevTools command in browser through ChromeDriver endpoint for DevTools commands and return its result.
+#  Selenium 3 does not know this endpoint, so it is registered in command executor of driver.
+def execute_cdp_command(my_driver, cmd, params):
+    my_driver.command_executor._commands['executeCdpCommand'] = ('POST', '/session/$sessionId/goog/cdp/execute')
+    return my_driver.execute('executeCdpCommand', {'cmd': cmd, 'params': params})['value']
+
+
+## Parse result of DevTools command Performance.getMetrics to dictionary (metric name => value).
+def parse_performance_metrics(result):
+    return {metric['name']: metric['value'] for metric in result['metrics']}
+
+
+## Enable collecting of runtime metrics in browser. Metrics are collected since enabling until the driver quits.
+def enable_performance_metrics(my_driver):
+    execute_cdp_command(my_driver, 'Performance.enable', {})
+
+
+## Read current values of runtime metrics (durations of script execution and tasks, size of JS heap etc.).
+def get_performance_metrics(my_driver):
+    return parse_performance_metrics(execute_cdp_command(my_driver, 'Performance.getMetrics', {}))
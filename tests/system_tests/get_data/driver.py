@@ -19,63 +19,56 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from time import sleep
-
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as ec
-from selenium.webdriver.common.by import By
 
 from web_browser_type import BrowserType
 from configuration import Config
+import jsr_extension
+import web_replay
+import devtools
 
 
-## Find URL of JSR option page after JSR was installed to browser.
-def find_options_jsr_page_url(driver, browser_type):
-    sleep(1)
-    # KNOWN ISSUE: Tab in browser is sometimes not switched by this command.
-    # And it leads to error and stopping execution of script. It is driver's issue.
-    # Workaround for this issue is wait a while before and after tabs switching.
-    driver.switch_to.window(driver.window_handles[-1])
-    sleep(1)
-    if browser_type == BrowserType.CHROME:
-        driver.get('chrome://system/')
-        WebDriverWait(driver, 60).until(
-            ec.presence_of_element_located((By.ID, 'extensions-value-btn'))
-        )
-        driver.find_element_by_id('extensions-value-btn').click()
-        for elem in driver.find_element_by_id('extensions-value').text.splitlines():
-            if 'JavaScript Restrictor' in elem:
-                return "chrome-extension://" + elem.split(':')[0][:-1] + "/options.html"
+## Set JSR level in web browser. Level is saved directly to extension storage from JSR options page,
+#  URL of which is derived from the packaged extension, so no UI automation is needed.
+def set_jsr_level(driver, browser_type, level):
+    driver.get(jsr_extension.get_jsr_options_page_url(browser_type))
+    driver.execute_async_script(jsr_extension.SET_JSR_LEVEL_SCRIPT, str(level))
 
 
-## Set JSR level in web browser.
-def set_jsr_level(driver, browser_type, level):
-    options_page = find_options_jsr_page_url(driver, browser_type)
-    driver.get(options_page)
-    driver.find_element_by_id('level-' + str(level)).click()
+## Get version of web browser controlled by driver.
+def get_browser_version(driver):
+    return driver.capabilities.get('browserVersion', driver.capabilities.get('version'))
 
 
-## Create web browser driver and start web browser.
-def create_driver(browser_type, with_jsr, jsr_level):
+## Create web browser driver and start web browser. Driver sends commands to WebDriver server given by URL
+#  (Selenium Grid server or local chromedriver) through keep-alive connection.
+def create_driver(browser_type, with_jsr, jsr_level, command_executor_url):
     if browser_type == BrowserType.CHROME:
         d = DesiredCapabilities.CHROME
         d['browserName'] = 'chrome'
         d['javascriptEnabled'] = True
-        d['loggingPreferences'] = {'browser': 'ALL'}
+        d['loggingPreferences'] = {'browser': 'ALL', 'performance': 'ALL'}
+        d['goog:loggingPrefs'] = {'browser': 'ALL', 'performance': 'ALL'}
+        # Accept JS dialogs automatically whenever they block a command.
+        # Opened dialogs are recorded in performance log as DevTools events.
+        d['unhandledPromptBehavior'] = 'accept'
 
     o = Options()
     o.add_argument("--start-maximized")
+    o.add_experimental_option('perfLoggingPrefs', devtools.get_perf_logging_prefs())
+    for argument in web_replay.get_browser_arguments():
+        o.add_argument(argument)
     if with_jsr:
         if browser_type == BrowserType.CHROME:
             o.add_extension(Config.jsr_extension_for_chrome_path)
 
     driver = webdriver.Remote(
-        command_executor='http://' + Config.grid_server_ip_address + ':4444/wd/hub',
+        command_executor=command_executor_url,
         desired_capabilities=d,
-        options=o)
+        options=o,
+        keep_alive=True)
 
     if with_jsr:
         set_jsr_level(driver, browser_type, jsr_level)
@@ -0,0 +1,54 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from threading import Thread
+
+from configuration import Config
+
+
+## Request handler serving files from directory with test pages without printing every request.
+class QuietRequestHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+## Start local HTTP server serving JSR test pages (docs/test) in a background thread.
+#  Browsers load test pages from it instead of from the internet.
+def start_fixture_server():
+    handler = partial(QuietRequestHandler, directory=Config.fixture_pages_path)
+    server = ThreadingHTTPServer(('', Config.fixture_server_port), handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+## Stop local HTTP server with test pages.
+def end_fixture_server(server):
+    if server is None:
+        return
+    server.shutdown()
+    server.server_close()
+
+
+## Get URL of test page served by local HTTP server.
+def get_fixture_page_url(page):
+    return 'http://' + Config.fixture_server_address + ':' + str(Config.fixture_server_port) + '/' + page
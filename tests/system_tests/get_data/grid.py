@@ -19,42 +19,100 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from subprocess import Popen
-from time import sleep
+from time import sleep, monotonic
+from urllib.request import urlopen
+from urllib.parse import quote
+from json import loads
 
 from configuration import Config
+import process_groups
 
 
-## Start Selenium Grid server as a new process on background.
+## Get URL of Selenium Grid server.
+def get_hub_url():
+    return 'http://' + Config.grid_server_ip_address + ':4444'
+
+
+## Get URL of status of Selenium Grid node listening on given port of this device.
+def get_node_status_url(port):
+    return 'http://localhost:' + str(port) + '/wd/hub/status'
+
+
+## Get ID of Selenium Grid node listening on given port of this device. Node is registered to server by this ID.
+def get_node_id(port):
+    return 'http://' + Config.grid_node_ip_address + ':' + str(port)
+
+
+## Start Selenium Grid server as a new process group on background. Use wait_for_grid to wait until it is ready.
 def start_server():
     start_server_command = ['java', '-jar', Config.selenium_server_jar_path, '-role', 'hub']
-    server = Popen(start_server_command)
-    sleep(6)
-    return server
+    return process_groups.start_process_group(start_server_command)
 
 
-## Start Selenium Grid Nodes as a new processes.
+## Start Selenium Grid Nodes as a new process groups at the same time. Every node listens on its own port.
+#  Chromedrivers and browsers started by node belong to its process group.
+#  Nodes try to register to server every second, so they can be started before the server is ready.
+#  Use wait_for_grid to wait until they are ready.
 def start_nodes():
-    start_node_command = ['java', '-Dwebdriver.chrome.driver=' + Config.chrome_driver_path, '-jar', Config.selenium_server_jar_path, '-role', 'node', '-hub', 'https://' + Config.grid_server_ip_address + ':4444/grid/register/']
+    start_node_command = ['java', '-Dwebdriver.chrome.driver=' + Config.chrome_driver_path, '-jar', Config.selenium_server_jar_path, '-role', 'node', '-hub', 'https://' + Config.grid_server_ip_address + ':4444/grid/register/', '-registerCycle', '1000', '-host', Config.grid_node_ip_address]
     nodes = []
     if Config.number_of_grid_nodes_on_this_device == 0:
         # Waiting on distributed environment when all Selenium Grid nodes will be running.
         input("When all testing nodes will be running, press Enter to start JSR system testing.")
     else:
         for node_number in range(Config.number_of_grid_nodes_on_this_device):
-            nodes.append(Popen(start_node_command))
-            sleep(7)
+            nodes.append(process_groups.start_process_group(start_node_command + ['-port', str(Config.grid_first_node_port + node_number)]))
     return nodes
 
 
-## End nodes when testing is finished.
+## Read JSON from given URL. Return None if it is not available.
+def read_json(url):
+    try:
+        with urlopen(url, timeout=2) as response:
+            return loads(response.read().decode('utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+## Test if Selenium Grid server or node given by URL of its status is ready to create new sessions.
+def is_ready(status_url):
+    status = read_json(status_url)
+    if status is None:
+        return False
+    return status.get('value', {}).get('ready', status.get('status') == 0)
+
+
+## Test if Selenium Grid node listening on given port of this device is registered to Selenium Grid server.
+def is_node_registered(port):
+    proxy = read_json(get_hub_url() + '/grid/api/proxy?id=' + quote(get_node_id(port), safe=''))
+    return proxy is not None and proxy.get('success', False)
+
+
+## Wait until Selenium Grid server and given nodes on this device are ready and every node is registered to server.
+#  Raise error when any process of Selenium Grid ends or when Selenium Grid is not ready until grid_startup_timeout.
+def wait_for_grid(processes, nodes_number):
+    deadline = monotonic() + Config.grid_startup_timeout
+    node_ports = range(Config.grid_first_node_port, Config.grid_first_node_port + nodes_number)
+    while True:
+        for process in processes:
+            if process.poll() is not None:
+                raise RuntimeError("Selenium Grid process ended with code " + str(process.returncode) + " during startup.")
+        if is_ready(get_hub_url() + '/wd/hub/status') and all(is_ready(get_node_status_url(port)) and is_node_registered(port) for port in node_ports):
+            print("Selenium Grid is ready.")
+            return
+        if monotonic() >= deadline:
+            raise TimeoutError("Selenium Grid is not ready in " + str(Config.grid_startup_timeout) + " seconds.")
+        sleep(0.5)
+
+
+## End nodes with their chromedrivers and browsers when testing is finished.
 def end_nodes(nodes, manually):
     if manually:
         input("After testing, press Enter to end the nodes.")
     for node in nodes:
-        node.kill()
+        process_groups.end_process_group(node)
 
 
 ## End Selenium Grid server when testing is finished and all nodes are terminated.
 def end_server(server):
-    server.kill()
+    process_groups.end_process_group(server)
@@ -19,21 +19,12 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from os import system, remove, path
+from os import system, remove, replace, path, name as os_name
 from shutil import rmtree
-import csv
-import numpy as np
 from pathlib import Path
-import glob
+from json import loads
 
-from configuration import Config
-
-
-## Read and return first n rows from csv file specified in Config static class.
-def read_n_top_rows_csv(n):
-    with open(Config.sites_to_test_csv_path, 'r') as csvTopSites:
-        data = np.array(list(csv.reader(csvTopSites)))
-    return data[0:n, 1]
+import process_groups
 
 
 ## Delete files defined by regex in directory if exists.
@@ -57,36 +48,97 @@ def append_file(path, text):
     f.close()
 
 
+## Write binary content to file given by path.
+def write_binary_file(path, content):
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
 ## Initialize output files for getting data.
-def init_output_files():
+#  Results of previous testing are deleted unless they should be kept for resuming interrupted testing.
+def init_output_files(keep_existing):
     create_folder_structure("../data/logs")
     create_folder_structure("../data/screenshots")
-    delete_files_if_exist("../data/logs", "*")
-    delete_files_if_exist("../data/screenshots", "*")
+    if keep_existing:
+        print("Resuming interrupted testing. Sites completed according to journal will be skipped.")
+    else:
+        delete_files_if_exist("../data/logs", "*")
+        delete_files_if_exist("../data/screenshots", "*")
+
+
+## Open logs part of given testing controller for appending records in NDJSON format (one JSON record per line).
+#  File is kept open during the whole testing, so records are written through one buffered writer.
+def open_logs_part(thread_mark, browser_type):
+    return open("../data/logs/logs_part_" + thread_mark + "_" + str(browser_type) + ".ndjson", 'a', newline='', encoding='utf-8')
+
+
+## Append one JSON record to opened NDJSON file. Record is flushed, so it is not lost when testing is interrupted
+#  and it is saved before it is recorded to journal.
+def write_ndjson_record(f, record_json):
+    f.write(record_json + '\n')
+    f.flush()
+
+
+## Read records from NDJSON file lazily one by one. Yield tuples (offset of record in file, record).
+#  Incomplete or corrupted lines, e.g. the last line of interrupted writing, are skipped.
+def read_ndjson_records(path):
+    with open(path, 'rb') as f:
+        offset = 0
+        for line in f:
+            try:
+                record = loads(line.decode('utf-8'))
+            except ValueError:
+                record = None
+            if record is not None:
+                yield offset, record
+            offset += len(line)
+
+
+## Test if logs record contains data obtained from both browsers without error.
+def is_logs_record_completed(record):
+    return record["logs_without_jsr"] != "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE" and record["logs_with_jsr"] != "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE"
 
 
 ## Finish output files when getting data is finished.
+#  Logs from previous (interrupted) testing and all logs parts are assembled to one NDJSON file sorted by site number.
+#  When a site was tested more times in the same browser on the same JSR level, completed record is preferred,
+#  otherwise the later record is taken.
+#  Files are streamed, only a small index (key and position of every record) is kept in memory.
 def finish_output_files():
-    logs_parts = list(Path("../data/logs").glob("logs_part_*.json"))
-
-    f = open("../data/logs/logs.json", 'a', newline='')
-    f.write("[")
-    for path in logs_parts[:-1]:
-        g = open(path, 'r', newline='')
-        f.write(g.read())
-        g.close()
-        remove(path)
-    with logs_parts[-1] as path:
-        g = open(path, 'r', newline='')
-        f.write(g.read()[:-1])
-        g.close()
-        remove(path)
-    f.write("]")
-    f.close()
+    logs_files = sorted(Path("../data/logs").glob("logs_part_*.ndjson"))
+    if path.isfile("../data/logs/logs.ndjson"):
+        logs_files.insert(0, Path("../data/logs/logs.ndjson"))
+    index = {}
+    for file_number, logs_file in enumerate(logs_files):
+        for offset, record in read_ndjson_records(logs_file):
+            key = (record["site"], record.get("browser"), record.get("jsr_level"))
+            completed = is_logs_record_completed(record)
+            if key not in index or completed or not index[key][3]:
+                index[key] = (record.get("site_number", 0), file_number, offset, completed)
+
+    opened_logs_files = [open(logs_file, 'rb') for logs_file in logs_files]
+    with open("../data/logs/logs.ndjson.tmp", 'wb') as f:
+        for site_number, file_number, offset, completed in sorted(index.values()):
+            opened_logs_files[file_number].seek(offset)
+            line = opened_logs_files[file_number].readline()
+            if not line.endswith(b'\n'):
+                line += b'\n'
+            f.write(line)
+    for opened_logs_file in opened_logs_files:
+        opened_logs_file.close()
+    replace("../data/logs/logs.ndjson.tmp", "../data/logs/logs.ndjson")
+    for logs_file in logs_files:
+        if logs_file.name != "logs.ndjson":
+            remove(logs_file)
 
 
 ## This functiona is called at the end of getting data.
 #  It terminate zombie processes of chrome and chromedriver if exist.
+#  On Windows, all processes of chrome and chromedriver are killed. On other systems, only process groups started
+#  by testing (Selenium Grid, local chromedrivers and their browsers) are killed.
 def terminate_zombie_processes():
-    system("taskkill /f /im chromedriver* 1>nul 2>&1")
-    system("taskkill /f /im chrome* 1>nul 2>&1")
+    if os_name == 'nt':
+        system("taskkill /f /im chromedriver* 1>nul 2>&1")
+        system("taskkill /f /im chrome* 1>nul 2>&1")
+    else:
+        process_groups.reap_process_groups()
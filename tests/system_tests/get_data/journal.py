@@ -0,0 +1,102 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+## Journal of getting data allows to resume interrupted testing.
+#
+#  Every tested unit (site, browser, JSR level) is recorded to an append-only journal file when its logs are saved.
+#  When testing is started again, units recorded as completed are skipped and only unfinished or failed units are tested.
+#  When testing is finished, journal is marked as finished, so the next testing starts from scratch.
+
+from os import path
+from json import dumps, loads
+
+from configuration import Config
+import io_funcs as io
+
+
+JOURNAL_PATH = "../data/logs/journal.ndjson"
+FINISHED_MARKER_PATH = "../data/logs/journal.finished"
+
+
+## Test if interrupted testing can be resumed, i.e. resuming is allowed in Config, journal exists
+#  and testing recorded in it was not finished.
+def can_resume():
+    return Config.resume_interrupted_testing and path.isfile(JOURNAL_PATH) and not path.isfile(FINISHED_MARKER_PATH)
+
+
+## Mark journal as finished when output files of testing are finished. Marker is deleted with other output files
+#  when the next testing starts.
+def mark_finished():
+    io.append_file(FINISHED_MARKER_PATH, "")
+
+
+## Record tested unit to journal.
+def record_unit(site, browser_type, jsr_level, completed):
+    io.append_file(JOURNAL_PATH, dumps({"site": site, "browser": str(browser_type), "jsr_level": jsr_level, "completed": completed}) + '\n')
+
+
+## Get current size of journal. Units recorded to journal later are read from this offset.
+def get_journal_offset():
+    return path.getsize(JOURNAL_PATH) if path.isfile(JOURNAL_PATH) else 0
+
+
+## Count sites (site, browser) recorded to journal since given offset, i.e. sites tested by the current testing.
+def count_tested_sites(offset):
+    tested_sites = set()
+    if not path.isfile(JOURNAL_PATH):
+        return 0
+    with open(JOURNAL_PATH, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            try:
+                record = loads(line.decode('utf-8'))
+            except ValueError:
+                continue
+            tested_sites.add((record["site"], record["browser"]))
+    return len(tested_sites)
+
+
+## Read journal and return set of completed units. Unit is a tuple (site, browser, JSR level).
+#  The last record of every unit is taken into account. Incomplete last line of interrupted writing is ignored.
+def read_completed_units():
+    completed_units = set()
+    if not path.isfile(JOURNAL_PATH):
+        return completed_units
+    with open(JOURNAL_PATH, 'r', newline='') as f:
+        for line in f:
+            try:
+                record = loads(line)
+            except ValueError:
+                continue
+            unit = (record["site"], record["browser"], record["jsr_level"])
+            if record["completed"]:
+                completed_units.add(unit)
+            else:
+                completed_units.discard(unit)
+    return completed_units
+
+
+## Filter out sites which were already completed in given browser on all given JSR levels.
+#  Site unfinished on any level is tested again on all levels, because all levels share the page loaded without JSR.
+#  Sites are given and returned as tuples (site_number, site).
+def get_unfinished_sites(numbered_sites, completed_units, browser_type, jsr_levels):
+    return [(site_number, site) for site_number, site in numbered_sites
+            if any((site, str(browser_type), jsr_level) not in completed_units for jsr_level in jsr_levels)]
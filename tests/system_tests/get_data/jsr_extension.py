@@ -0,0 +1,123 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from functools import lru_cache
+from hashlib import sha256
+from struct import unpack
+
+from configuration import Config
+from web_browser_type import BrowserType
+
+
+## Script setting default JSR level directly in extension storage. It has to be run on a page of JSR extension.
+#  It waits until JSR initializes its storage after installation (storage version is set), so the level is not
+#  overwritten by the initialization.
+SET_JSR_LEVEL_SCRIPT = """
+var level = arguments[0];
+var done = arguments[arguments.length - 1];
+function setLevel() {
+    chrome.storage.sync.get(null, function (items) {
+        if (!items.hasOwnProperty("version")) {
+            setTimeout(setLevel, 50);
+            return;
+        }
+        chrome.storage.sync.set({__default__: level}, function () {
+            done(true);
+        });
+    });
+}
+setLevel();
+"""
+
+
+## Read one varint from protocol buffer data. Return value and position after varint.
+def read_varint(data, position):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7f) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, position
+
+
+## Parse fields of protocol buffer message. Return dictionary of field number to list of raw values.
+#  Only varint and length-delimited fields are expected in crx header.
+def parse_protobuf_fields(data):
+    fields = {}
+    position = 0
+    while position < len(data):
+        key, position = read_varint(data, position)
+        field_number = key >> 3
+        wire_type = key & 0x07
+        if wire_type == 0:
+            value, position = read_varint(data, position)
+        elif wire_type == 2:
+            length, position = read_varint(data, position)
+            value = data[position:position + length]
+            position += length
+        else:
+            raise ValueError("Unsupported protocol buffer wire type in crx header: " + str(wire_type))
+        fields.setdefault(field_number, []).append(value)
+    return fields
+
+
+## Convert 16 bytes of extension hash to Chrome extension ID (hexadecimal digits mapped to letters a-p).
+def hash_to_extension_id(extension_hash):
+    return ''.join([chr(ord('a') + int(digit, 16)) for digit in extension_hash[:16].hex()])
+
+
+## Get ID of Chrome extension from packaged crx file (versions 2 and 3).
+#  ID is derived from the public key of extension, so it does not have to be found in browser.
+def get_crx_extension_id(crx_path):
+    with open(crx_path, 'rb') as crx:
+        magic, version = unpack('<4sI', crx.read(8))
+        if magic != b'Cr24':
+            raise ValueError("File is not a crx package: " + crx_path)
+        if version == 2:
+            public_key_length, signature_length = unpack('<II', crx.read(8))
+            return hash_to_extension_id(sha256(crx.read(public_key_length)).digest())
+        if version == 3:
+            header_length, = unpack('<I', crx.read(4))
+            header = parse_protobuf_fields(crx.read(header_length))
+            # CrxFileHeader.signed_header_data (10000) contains SignedData with crx_id (1).
+            if 10000 in header:
+                signed_data = parse_protobuf_fields(header[10000][0])
+                if 1 in signed_data:
+                    return hash_to_extension_id(signed_data[1][0])
+            # CrxFileHeader.sha256_with_rsa (2) contains AsymmetricKeyProof with public_key (1).
+            return hash_to_extension_id(sha256(parse_protobuf_fields(header[2][0])[1][0]).digest())
+        raise ValueError("Unsupported crx package version " + str(version) + ": " + crx_path)
+
+
+## Get ID of JSR extension in given browser. It is computed only once in every process.
+@lru_cache(maxsize=None)
+def get_jsr_extension_id(browser_type):
+    if browser_type == BrowserType.CHROME:
+        return get_crx_extension_id(Config.jsr_extension_for_chrome_path)
+
+
+## Get URL of JSR options page in given browser.
+def get_jsr_options_page_url(browser_type):
+    if browser_type == BrowserType.CHROME:
+        return "chrome-extension://" + get_jsr_extension_id(browser_type) + "/options.html"
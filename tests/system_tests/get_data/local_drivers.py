@@ -0,0 +1,73 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+## Pool of local chromedriver processes replaces Selenium Grid on single device. Every testing controller has its own
+#  chromedriver, so WebDriver commands go to browsers directly without Selenium Grid server and nodes.
+
+from time import sleep, monotonic
+
+from configuration import Config
+from driver_mode import DriverMode
+import grid
+import process_groups
+
+
+## Get URL of local chromedriver with given number (counted from 0).
+def get_local_driver_url(driver_number):
+    return 'http://localhost:' + str(Config.local_driver_first_port + driver_number)
+
+
+## Get URL of WebDriver server which drives browsers of testing controller with given mark.
+#  Browsers are driven by Selenium Grid server, or by chromedriver of the controller in local driver mode.
+def get_command_executor_url(thread_mark):
+    if Config.driver_mode == DriverMode.LOCAL:
+        return get_local_driver_url(ord(thread_mark) - ord('A'))
+    return 'http://' + Config.grid_server_ip_address + ':4444/wd/hub'
+
+
+## Start chromedriver process group for every testing controller, browsers started by chromedriver belong to its group. Use wait_for_local_drivers to wait until they are ready.
+def start_local_drivers():
+    local_drivers = []
+    for driver_number in range(Config.number_of_concurrent_sites_testing):
+        local_drivers.append(process_groups.start_process_group([Config.chrome_driver_path, '--port=' + str(Config.local_driver_first_port + driver_number)]))
+    return local_drivers
+
+
+## Wait until all local chromedrivers are ready to create new sessions.
+#  Raise error when any chromedriver ends or when chromedrivers are not ready until grid_startup_timeout.
+def wait_for_local_drivers(local_drivers):
+    deadline = monotonic() + Config.grid_startup_timeout
+    while True:
+        for local_driver in local_drivers:
+            if local_driver.poll() is not None:
+                raise RuntimeError("Chromedriver ended with code " + str(local_driver.returncode) + " during startup.")
+        if all(grid.is_ready(get_local_driver_url(driver_number) + '/status') for driver_number in range(len(local_drivers))):
+            print("Local chromedrivers are ready.")
+            return
+        if monotonic() >= deadline:
+            raise TimeoutError("Local chromedrivers are not ready in " + str(Config.grid_startup_timeout) + " seconds.")
+        sleep(0.2)
+
+
+## End local chromedrivers with their browsers when testing is finished.
+def end_local_drivers(local_drivers):
+    for local_driver in local_drivers:
+        process_groups.end_process_group(local_driver)
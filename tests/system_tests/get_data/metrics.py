@@ -0,0 +1,217 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+## Live metrics of testing served by local HTTP endpoint in Prometheus text format.
+#
+#  Testing controllers (in any process) send events about tested sites to a queue. Metrics collector in the main process
+#  reads the events and aggregates them, so controllers never wait for it. Metrics are served at /metrics:
+#  tested sites, sites per minute, queued sites, sites and browser sessions in flight, histograms of durations
+#  of phases, page errors by type and busy time of every testing controller.
+#  Busy time is per controller and not per Grid node: in Grid mode, all controllers send commands to Grid server,
+#  which does not tell the crawler which node runs a session. Label webdriver_url distinguishes local chromedrivers.
+
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from multiprocessing import Queue
+from threading import Thread, Lock
+from time import time
+
+from configuration import Config
+
+
+## Upper bounds (in seconds) of buckets of histograms of phase durations.
+DURATION_BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 240]
+
+## Sites per minute are computed from sites finished in this number of last seconds.
+THROUGHPUT_WINDOW = 300
+
+
+## Send event about start of testing of site by controller with given mark. Sessions is number of browser sessions
+#  which load the site at the same time.
+def record_site_started(events, thread_mark, browser_type, sessions):
+    events.put(('site_started', thread_mark, str(browser_type), sessions))
+
+
+## Send event about finished site with its logs of all JSR levels. Timings and errors of page loaded without JSR
+#  are counted once and only when the page was not taken from baseline cache.
+def record_site_finished(events, thread_mark, browser_type, command_executor_url, duration, site_logs):
+    records = [(page_logs.jsr_level, page_logs.is_completed()) for page_logs in site_logs]
+    pages = [(True, page_logs.timings_with_jsr, page_logs.errors_with_jsr) for page_logs in site_logs]
+    if site_logs and site_logs[0].baseline_capture_date is None:
+        pages.append((False, site_logs[0].timings_without_jsr, site_logs[0].errors_without_jsr))
+    events.put(('site_finished', thread_mark, str(browser_type), command_executor_url, duration, records,
+                [(with_jsr, timings, [error['type'] for error in errors]) for with_jsr, timings, errors in pages]))
+
+
+## Format labels of metric.
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(name + '="' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"' for name, value in labels) + '}'
+
+
+## MetricsCollector object aggregates events of testing in a background thread of the main process.
+class MetricsCollector:
+    def __init__(self):
+        self.events = Queue()
+        self.lock = Lock()
+        self.start_time = time()
+        self.queued_sites = {}
+        self.sites_tested = {}
+        self.finish_times = deque()
+        self.in_flight = {}
+        self.durations = {}
+        self.page_errors = {}
+        self.busy_seconds = {}
+        self.thread = Thread(target=self.collect, daemon=True)
+        self.thread.start()
+
+    ## Set number of sites waiting for testing in given browser at the start of testing.
+    def set_queued_sites(self, browser_type, sites_number):
+        with self.lock:
+            self.queued_sites[str(browser_type)] = sites_number
+
+    ## Read events until end mark (None) is received.
+    def collect(self):
+        while True:
+            event = self.events.get()
+            if event is None:
+                break
+            with self.lock:
+                if event[0] == 'site_started':
+                    self.site_started(*event[1:])
+                else:
+                    self.site_finished(*event[1:])
+
+    def site_started(self, thread_mark, browser, sessions):
+        self.in_flight[(thread_mark, browser)] = sessions
+        if browser in self.queued_sites:
+            self.queued_sites[browser] = max(0, self.queued_sites[browser] - 1)
+
+    def site_finished(self, thread_mark, browser, command_executor_url, duration, records, pages):
+        self.in_flight.pop((thread_mark, browser), None)
+        for jsr_level, completed in records:
+            key = (browser, jsr_level, completed)
+            self.sites_tested[key] = self.sites_tested.get(key, 0) + 1
+        now = time()
+        self.finish_times.append(now)
+        while self.finish_times and self.finish_times[0] < now - THROUGHPUT_WINDOW:
+            self.finish_times.popleft()
+        for with_jsr, timings, error_types in pages:
+            for phase, phase_duration in timings.items():
+                histogram = self.durations.setdefault((phase, with_jsr), [0] * len(DURATION_BUCKETS) + [0, 0])
+                for bucket, upper_bound in enumerate(DURATION_BUCKETS):
+                    if phase_duration <= upper_bound:
+                        histogram[bucket] += 1
+                histogram[-2] += phase_duration
+                histogram[-1] += 1
+            for error_type in error_types:
+                self.page_errors[error_type] = self.page_errors.get(error_type, 0) + 1
+        controller = (thread_mark, command_executor_url)
+        self.busy_seconds[controller] = self.busy_seconds.get(controller, 0) + duration
+
+    ## Get sites finished per minute in the last THROUGHPUT_WINDOW seconds (or since start of testing).
+    def get_sites_per_minute(self):
+        now = time()
+        recent_sites = len([finish_time for finish_time in self.finish_times if finish_time >= now - THROUGHPUT_WINDOW])
+        return round(recent_sites * 60 / max(1, min(THROUGHPUT_WINDOW, now - self.start_time)), 3)
+
+    ## Format all metrics in Prometheus text format.
+    def format_metrics(self):
+        lines = []
+
+        def add_metric(name, metric_type, description, samples):
+            lines.append('# HELP ' + name + ' ' + description)
+            lines.append('# TYPE ' + name + ' ' + metric_type)
+            for labels, value in samples:
+                lines.append(name + format_labels(labels) + ' ' + str(value))
+
+        with self.lock:
+            add_metric('crawler_uptime_seconds', 'gauge', 'Time since start of testing.', [([], round(time() - self.start_time, 3))])
+            add_metric('crawler_sites_tested_total', 'counter', 'Logs records of tested sites by browser, JSR level and completion.',
+                       [([('browser', browser), ('jsr_level', jsr_level), ('completed', str(completed).lower())], count)
+                        for (browser, jsr_level, completed), count in sorted(self.sites_tested.items(), key=str)])
+            add_metric('crawler_sites_per_minute', 'gauge', 'Sites finished per minute in the last ' + str(THROUGHPUT_WINDOW) + ' seconds.',
+                       [([], self.get_sites_per_minute())])
+            add_metric('crawler_queued_sites', 'gauge', 'Sites waiting for testing by browser.',
+                       [([('browser', browser)], count) for browser, count in sorted(self.queued_sites.items())])
+            add_metric('crawler_sites_in_flight', 'gauge', 'Sites being tested.', [([], len(self.in_flight))])
+            add_metric('crawler_sessions_in_flight', 'gauge', 'Browser sessions loading sites.', [([], sum(self.in_flight.values()))])
+            lines.append('# HELP crawler_phase_duration_seconds Duration of phases of getting data of page.')
+            lines.append('# TYPE crawler_phase_duration_seconds histogram')
+            for (phase, with_jsr), histogram in sorted(self.durations.items(), key=str):
+                labels = [('phase', phase), ('with_jsr', str(with_jsr).lower())]
+                for upper_bound, count in zip(DURATION_BUCKETS, histogram):
+                    lines.append('crawler_phase_duration_seconds_bucket' + format_labels(labels + [('le', upper_bound)]) + ' ' + str(count))
+                lines.append('crawler_phase_duration_seconds_bucket' + format_labels(labels + [('le', '+Inf')]) + ' ' + str(histogram[-1]))
+                lines.append('crawler_phase_duration_seconds_sum' + format_labels(labels) + ' ' + str(round(histogram[-2], 3)))
+                lines.append('crawler_phase_duration_seconds_count' + format_labels(labels) + ' ' + str(histogram[-1]))
+            add_metric('crawler_page_errors_total', 'counter', 'Errors of getting data of page by type.',
+                       [([('type', error_type)], count) for error_type, count in sorted(self.page_errors.items())])
+            add_metric('crawler_controller_busy_seconds_total', 'counter', 'Time spent by testing controller on sites (per controller, not per Grid node).',
+                       [([('controller', thread_mark), ('webdriver_url', command_executor_url)], round(seconds, 3))
+                        for (thread_mark, command_executor_url), seconds in sorted(self.busy_seconds.items())])
+        return '\n'.join(lines) + '\n'
+
+    ## Stop reading events.
+    def close(self):
+        self.events.put(None)
+        self.thread.join()
+
+
+## Request handler serving metrics at /metrics.
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    collector = None
+
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+        body = self.collector.format_metrics().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+## Start HTTP server with metrics of given collector in a background thread.
+#  Server is bound to localhost only and it is not started when metrics_port is None.
+def start_metrics_server(collector):
+    if Config.metrics_port is None:
+        return None
+    handler = type('BoundMetricsRequestHandler', (MetricsRequestHandler,), {'collector': collector})
+    server = ThreadingHTTPServer(('localhost', Config.metrics_port), handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    print("Metrics of testing are served at http://localhost:" + str(Config.metrics_port) + "/metrics")
+    return server
+
+
+## Stop HTTP server with metrics and metrics collector.
+def end_metrics_server(server, collector):
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+    if collector is not None:
+        collector.close()
@@ -0,0 +1,111 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+## Parts of getting data of one page which are shared by crawler engines (page workers and asyncio engine).
+#
+#  Engines only send commands to browser, each in its own way (blocking or asynchronously). Deciding which data
+#  are taken from loaded page, recording of errors with their types, building of PageData and saving of screenshot
+#  and baseline cache entry are done here, so both engines produce the same data. Nothing here communicates with browser.
+
+from functools import partial
+
+from configuration import Config
+from test_type import TestType
+from page_error import PageError
+from website import PageData
+import page_errors
+import baseline_cache
+import screenshots
+
+
+## Build PageData of page whose data could not be taken at all, e.g. when browser session could not be started
+#  or getting data timed out. Given errors describe why.
+def build_error_page_data(timings, errors):
+    return PageData("ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE", None, timings, None, errors)
+
+
+## PageDataBuilder object collects data of one page taken from browser and builds PageData from them.
+#
+#  Engine loads page and then takes logs, screenshot and performance when takes_logs, takes_screenshot
+#  and takes_performance are set. Failure of every step is reported to the builder, which records it to error recorder.
+#  DevTools events read while waiting for page are collected in events. Screenshot is kept as obtained from browser
+#  until it is saved by save.
+class PageDataBuilder:
+    def __init__(self, site, site_number, browser_type, jsr_level, timer, recorder):
+        self.site = site
+        self.site_number = site_number
+        self.browser_type = browser_type
+        self.jsr_level = jsr_level
+        self.timer = timer
+        self.recorder = recorder
+        self.takes_logs = TestType.LOGS in Config.perform_tests
+        self.takes_screenshot = TestType.SCREENSHOTS in Config.perform_tests
+        self.takes_performance = TestType.PERFORMANCE in Config.perform_tests
+        self.logs = []
+        self.events = []
+        self.metrics_before = None
+        self.performance = None
+        self.screenshot = None
+
+    ## Record exception raised while page was loaded or while it settled. No other data are taken from the page then.
+    def loading_failed(self, exception):
+        print("An exception occurred while loading page: " + self.site)
+        self.recorder.add(page_errors.classify_error(exception), self.timer.phase, exception)
+        self.logs = "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE"
+
+    ## Record exception raised while logs of loaded page were taken.
+    def log_fetch_failed(self, exception):
+        print("An exception occurred while getting page logs: " + self.site)
+        self.recorder.add(page_errors.classify_error(exception, PageError.LOG_FETCH_FAILED), 'log_fetch', exception)
+        self.logs = "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE"
+
+    ## Record exception raised while screenshot of loaded page was taken.
+    def screenshot_failed(self, exception):
+        print("An exception occurred while getting page screenshot: " + self.site)
+
+    ## Record exception raised while performance data of loaded page were taken.
+    def performance_failed(self, exception):
+        print("An exception occurred while getting page performance: " + self.site)
+
+    ## Build PageData of page from collected data. Number of dismissed dialogs is None if it is not known.
+    def build(self, dialogs_dismissed, browser_version):
+        page_data = PageData(self.logs, dialogs_dismissed, self.timer.timings, self.performance, self.recorder.errors)
+        page_data.browser_version = browser_version
+        return page_data
+
+    ## Write screenshot of page by given screenshot writer and save page loaded without JSR to baseline cache.
+    #  When screenshots are tested, cache entry is saved only after its screenshot is written, and it is not saved
+    #  when screenshot was not taken, so cached page data are never paired with stale or missing screenshot.
+    def save(self, page_data, screenshot_writer):
+        cacheable = self.jsr_level is None and baseline_cache.is_cacheable(page_data)
+        if not self.takes_screenshot:
+            if cacheable:
+                baseline_cache.save_page_data(self.site, self.browser_type, page_data)
+            return
+        if self.screenshot is None:
+            return
+        name = "without_jsr" if self.jsr_level is None else "with_jsr_level_" + str(self.jsr_level)
+        paths = [screenshots.get_screenshot_path(self.site, self.site_number, name)]
+        after_written = None
+        if cacheable:
+            paths.append(baseline_cache.get_cached_screenshot_path(self.site, self.browser_type, page_data.browser_version))
+            after_written = partial(baseline_cache.save_page_data, self.site, self.browser_type, page_data)
+        screenshot_writer.write(self.screenshot, paths, after_written)
@@ -0,0 +1,44 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from enum import Enum
+
+
+## Types of errors which can occur while getting data of page.
+#  DNS_FAILURE - domain of site was not resolved.
+#  NAVIGATION_FAILED - browser showed error page instead of site (e.g. connection refused, certificate error).
+#  NAVIGATION_TIMEOUT - WebDriver command timed out while page was loading or settling.
+#  RENDERER_CRASH - renderer process of page crashed, browser session may still run.
+#  SESSION_LOST - browser session or WebDriver server is not reachable anymore.
+#  SESSION_START_FAILED - new browser session could not be started.
+#  LOG_FETCH_FAILED - page was loaded, but its console logs could not be read.
+#  WORKER_TIMEOUT - data of page were not obtained until get_page_data_timeout.
+#  LOADING_FAILED - other error while loading page.
+class PageError(Enum):
+    DNS_FAILURE = 'dns_failure'
+    NAVIGATION_FAILED = 'navigation_failed'
+    NAVIGATION_TIMEOUT = 'navigation_timeout'
+    RENDERER_CRASH = 'renderer_crash'
+    SESSION_LOST = 'session_lost'
+    SESSION_START_FAILED = 'session_start_failed'
+    LOG_FETCH_FAILED = 'log_fetch_failed'
+    WORKER_TIMEOUT = 'worker_timeout'
+    LOADING_FAILED = 'loading_failed'
@@ -0,0 +1,135 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+## Classification of errors which occur while getting data of page and recovery from them.
+#
+#  Every failed attempt to get data of page is recorded with type of error, phase in which it occurred and time since
+#  the first attempt. Browser session is rebuilt only after errors which break it. Other errors are retried
+#  in the same session according to retry policy of their type, with exponential backoff.
+
+from time import time
+
+from configuration import Config
+from page_error import PageError
+
+
+## Error pages of browser are recognized by their URL. Script returns text of error code shown on error page,
+#  or null when page is not an error page.
+NAVIGATION_ERROR_SCRIPT = "return location.href.startsWith('chrome-error://') ? ((document.querySelector('.error-code') || document.body || {}).innerText || 'unknown') : null;"
+
+## Types of errors after which browser session can not be used anymore.
+SESSION_BREAKING_ERRORS = [PageError.RENDERER_CRASH, PageError.SESSION_LOST, PageError.SESSION_START_FAILED, PageError.WORKER_TIMEOUT]
+
+## Time in seconds reserved in every attempt for steps other than loading and settling of page
+#  (clearing of console, fetching of logs, screenshot and performance data).
+ATTEMPT_OVERHEAD = 10
+
+## Time in seconds reserved for creating a new browser session before attempt which follows error breaking the session.
+DRIVER_CREATION_TIME = 30
+
+## Parts of error codes (lowercase) shown on error pages of browser which identify DNS failure.
+DNS_ERROR_CODES = ['err_name_not_resolved', 'dns_probe']
+
+## Parts of error messages (lowercase) of browser and WebDriver which identify type of error. They are tested in this order.
+ERROR_MESSAGES = [
+    (PageError.DNS_FAILURE, DNS_ERROR_CODES),
+    (PageError.RENDERER_CRASH, ['tab crashed', 'page crash']),
+    (PageError.SESSION_LOST, ['invalid session id', 'no such session', 'chrome not reachable', 'disconnected', 'connection refused', 'session deleted']),
+    (PageError.NAVIGATION_TIMEOUT, ['timeout', 'timed out']),
+]
+
+
+## NavigationError is raised when browser shows its error page instead of loaded site.
+class NavigationError(Exception):
+    pass
+
+
+## Raise NavigationError when page loaded in browser is error page of browser.
+#  Error code is result of NAVIGATION_ERROR_SCRIPT executed in the page.
+def check_navigation_error(error_code):
+    if error_code is not None:
+        raise NavigationError(error_code)
+
+
+## Get type of error from exception raised while getting data of page. Return given default type
+#  when the exception is not recognized.
+def classify_error(exception, default=PageError.LOADING_FAILED):
+    message = (type(exception).__name__ + ': ' + str(exception)).lower()
+    if isinstance(exception, NavigationError):
+        return PageError.DNS_FAILURE if any(error_code in message for error_code in DNS_ERROR_CODES) else PageError.NAVIGATION_FAILED
+    if isinstance(exception, (ConnectionError, EOFError)):
+        return PageError.SESSION_LOST
+    for page_error, message_parts in ERROR_MESSAGES:
+        if any(message_part in message for message_part in message_parts):
+            return page_error
+    return default
+
+
+## ErrorRecorder object records failed attempts to get data of one page and decides about their retrying.
+class ErrorRecorder:
+    def __init__(self):
+        self.start = time()
+        self.errors = []
+        self.attempts = 0
+        self.attempt_start = 0
+
+    ## Start a new attempt to get data of page.
+    def start_attempt(self):
+        self.attempts += 1
+        self.attempt_start = len(self.errors)
+
+    ## Record error of given type which occurred in given phase. Message of error is shortened.
+    def add(self, page_error, phase, exception=None):
+        self.errors.append({"type": page_error.value, "phase": phase, "message": str(exception)[:200] if exception is not None else None,
+                            "time": round(time() - self.start, 3)})
+        print("Error " + page_error.value + " in phase " + phase + (": " + str(exception).splitlines()[0] if exception is not None and str(exception) else ""))
+
+    ## Get type of the last error of the current attempt, or None if the attempt did not fail.
+    def get_attempt_error(self):
+        if len(self.errors) == self.attempt_start:
+            return None
+        return PageError(self.errors[-1]["type"])
+
+
+## Test if error of given type breaks browser session, so the session has to be rebuilt.
+def is_session_broken(page_error):
+    return page_error in SESSION_BREAKING_ERRORS
+
+
+## Get the longest duration in seconds of attempt which follows error of given type: page load and settle timeouts,
+#  other steps of attempt and creation of a new browser session when the error broke the session.
+def get_attempt_duration(page_error):
+    duration = Config.page_load_timeout + Config.page_settle_timeout + ATTEMPT_OVERHEAD
+    if is_session_broken(page_error):
+        duration += DRIVER_CREATION_TIME
+    return duration
+
+
+## Get delay in seconds before the next attempt after given number of failed attempts with error of given type.
+#  Return None if the error should not be retried, or if the next attempt would not finish until deadline
+#  (the longest duration of attempt is reserved for it, see get_attempt_duration).
+def get_retry_delay(page_error, failed_attempts, deadline):
+    if page_error is None or failed_attempts > Config.page_error_retries.get(page_error, 0):
+        return None
+    delay = Config.page_error_retry_backoff * 2 ** (failed_attempts - 1)
+    if time() + delay + get_attempt_duration(page_error) > deadline:
+        return None
+    return delay
@@ -0,0 +1,97 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import devtools
+
+
+## Get Navigation Timing entry of loaded page. Times are in milliseconds since start of navigation.
+NAVIGATION_TIMING_SCRIPT = "var entries = performance.getEntriesByType('navigation'); return entries.length ? entries[0].toJSON() : null;"
+
+## Get paint timings (first-paint, first-contentful-paint) of loaded page as list of pairs [name, start time].
+PAINT_TIMING_SCRIPT = "return performance.getEntriesByType('paint').map(function (entry) { return [entry.name, entry.startTime]; });"
+
+## Fields of Navigation Timing entry which are stored.
+NAVIGATION_TIMING_FIELDS = ['responseStart', 'responseEnd', 'domInteractive', 'domContentLoadedEventEnd', 'domComplete', 'loadEventEnd', 'duration', 'transferSize']
+
+## DevTools metrics which grow during whole life of renderer process of browser tab. The difference between values read
+#  before and after loading of page is stored. Cross-site navigation swaps renderer process and these metrics start
+#  again from zero, values read after loading of page are then stored as they are.
+CUMULATIVE_METRICS = ['ScriptDuration', 'TaskDuration', 'LayoutDuration', 'RecalcStyleDuration', 'LayoutCount', 'RecalcStyleCount']
+
+## DevTools metrics which describe current state of loaded page. The value read after loading of page is stored.
+STATE_METRICS = ['JSHeapUsedSize', 'JSHeapTotalSize', 'Nodes', 'Documents', 'Frames', 'JSEventListeners']
+
+
+## Select stored fields of Navigation Timing entry. Times are rounded to tenths of millisecond.
+def select_navigation_timing(navigation_entry):
+    if navigation_entry is None:
+        return None
+    return {field: round(navigation_entry[field], 1) for field in NAVIGATION_TIMING_FIELDS if field in navigation_entry}
+
+
+## Convert paint timings obtained by PAINT_TIMING_SCRIPT to dictionary (paint name => start time in milliseconds).
+def select_paint_timing(paint_entries):
+    return {name: round(start_time, 1) for name, start_time in paint_entries}
+
+
+## Select stored DevTools metrics. Cumulative metrics are related to loaded page only by subtracting values
+#  read before loading of page, unless any of them decreased, i.e. renderer process was swapped by navigation.
+#  Durations are converted from seconds to milliseconds.
+def select_metrics(metrics_before, metrics_after):
+    if metrics_before is None or metrics_after is None:
+        return None
+    renderer_swapped = any(metrics_after.get(name, 0) < metrics_before.get(name, 0) for name in CUMULATIVE_METRICS)
+    metrics = {}
+    for name in CUMULATIVE_METRICS:
+        if name in metrics_after:
+            value = metrics_after[name] if renderer_swapped else metrics_after[name] - metrics_before.get(name, 0)
+            metrics[name] = round(value * 1000, 1) if name.endswith('Duration') else value
+    for name in STATE_METRICS:
+        if name in metrics_after:
+            metrics[name] = metrics_after[name]
+    return metrics
+
+
+## Build performance data of loaded page from values obtained from browser.
+def build_performance_data(navigation_entry, paint_entries, metrics_before, metrics_after):
+    return {'navigation': select_navigation_timing(navigation_entry),
+            'paint': select_paint_timing(paint_entries),
+            'metrics': select_metrics(metrics_before, metrics_after)}
+
+
+## Read DevTools metrics before loading of page. Metrics are not available when browser does not support
+#  DevTools commands, performance data of page then contain only Navigation Timing and paint timings.
+def get_metrics_before_load(my_driver, site):
+    try:
+        return devtools.get_performance_metrics(my_driver)
+    except:
+        print("An exception occurred while getting page performance metrics: " + site)
+        return None
+
+
+## Get performance data of loaded page. Given DevTools metrics were read before loading of page.
+def get_page_performance(my_driver, metrics_before):
+    metrics_after = None
+    if metrics_before is not None:
+        metrics_after = devtools.get_performance_metrics(my_driver)
+    navigation_entry = my_driver.execute_script(NAVIGATION_TIMING_SCRIPT)
+    paint_entries = my_driver.execute_script(PAINT_TIMING_SCRIPT)
+    return build_performance_data(navigation_entry, paint_entries, metrics_before, metrics_after)
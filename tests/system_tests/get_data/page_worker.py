@@ -0,0 +1,272 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from time import time, monotonic, sleep
+from multiprocessing import Process, Pipe, Queue, Array, Event
+from multiprocessing.connection import wait
+
+from selenium.common.exceptions import TimeoutException
+
+from configuration import Config
+import driver
+import devtools
+import page_performance
+import screenshots
+import fixture_server
+import page_errors
+from test_type import TestType
+from page_error import PageError
+from page_data_builder import PageDataBuilder, build_error_page_data
+from timings import PhaseTimer
+from browser_recycling import BrowserRecycler, get_user_data_dir
+import process_groups
+
+
+## If JSR is active and set to level 3, open page without XMLHttpRequest and clear logs from previous loaded page.
+def clear_console_logs(my_driver, jsr_level):
+        if jsr_level == 3:
+            my_driver.get(fixture_server.get_fixture_page_url('test.html'))
+            my_driver.get_log('browser')
+
+
+## Load website in given browser. If website is not loaded until page load timeout, stop loading
+#  and continue with the part of website which was already loaded. Driver stays usable for next sites.
+#  Raise NavigationError when browser shows its error page instead of website.
+def load_page(my_driver, site):
+    try:
+        my_driver.get('http://www.' + site)
+    except TimeoutException:
+        print("Page load timeout expired, loading of page was stopped: " + site)
+        my_driver.execute_script("window.stop();")
+    page_errors.check_navigation_error(my_driver.execute_script(page_errors.NAVIGATION_ERROR_SCRIPT))
+
+
+## Count JS dialogs which were opened in browser according to given DevTools events and events recorded since the last reading.
+#  Dialogs are accepted automatically by driver (unhandledPromptBehavior capability), so every opened dialog was dismissed.
+def count_dismissed_dialogs(my_driver, events, site):
+    try:
+        return devtools.count_opened_dialogs(events + devtools.get_devtools_events(my_driver))
+    except:
+        print("An exception occurred while counting dismissed dialogs: " + site)
+        return None
+
+
+## Load website in given browser and get data (log, screenshot and performance) from browser when website is loaded.
+#  Data are taken as soon as the page settles (its network is idle).
+#  Duration of every phase is measured by given timer. Screenshot is written to disk by given screenshot writer.
+#  Page loaded without JSR is saved to baseline cache, see PageDataBuilder.save. Errors are recorded by given error recorder with their types, see page_data_builder.
+def get_page_data(my_driver, browser_type, jsr_level, site, site_number, timer, screenshot_writer, recorder):
+    builder = PageDataBuilder(site, site_number, browser_type, jsr_level, timer, recorder)
+    try:
+        with timer.measure('console_clear'):
+            clear_console_logs(my_driver, jsr_level)
+        if builder.takes_performance:
+            with timer.measure('performance_fetch'):
+                builder.metrics_before = page_performance.get_metrics_before_load(my_driver, site)
+        with timer.measure('page_load'):
+            load_page(my_driver, site)
+        with timer.measure('page_settle'):
+            devtools.wait_for_network_idle(my_driver, builder.events)
+    except Exception as exception:
+        builder.loading_failed(exception)
+    else:
+        if builder.takes_logs:
+            try:
+                with timer.measure('log_fetch'):
+                    builder.logs = my_driver.get_log('browser')
+            except Exception as exception:
+                builder.log_fetch_failed(exception)
+        if builder.takes_screenshot:
+            try:
+                with timer.measure('screenshot'):
+                    builder.screenshot = screenshots.capture_screenshot(my_driver)
+            except Exception as exception:
+                builder.screenshot_failed(exception)
+        if builder.takes_performance:
+            try:
+                with timer.measure('performance_fetch'):
+                    builder.performance = page_performance.get_page_performance(my_driver, builder.metrics_before)
+            except Exception as exception:
+                builder.performance_failed(exception)
+    page_data = builder.build(count_dismissed_dialogs(my_driver, builder.events, site), driver.get_browser_version(my_driver))
+    builder.save(page_data, screenshot_writer)
+    return page_data
+
+
+## Create driver of page worker. Page load timeout is set, so a slow page does not block the driver forever.
+#  Viewport is fixed, so screenshots from all browsers have the same size.
+#  User data directory of the browser is shared with PageWorker object, so it can kill the browser of not responding worker.
+def create_worker_driver(browser_type, with_jsr, jsr_level, command_executor_url, browser_dir):
+    my_driver = driver.create_driver(browser_type, with_jsr=with_jsr, jsr_level=jsr_level, command_executor_url=command_executor_url)
+    browser_dir.value = (get_user_data_dir(my_driver.capabilities) or '').encode('utf-8')
+    my_driver.set_page_load_timeout(Config.page_load_timeout)
+    screenshots.set_viewport(my_driver)
+    if TestType.PERFORMANCE in Config.perform_tests:
+        try:
+            devtools.enable_performance_metrics(my_driver)
+        except:
+            print("Performance metrics are not supported by browser: " + str(browser_type))
+    return my_driver
+
+
+## Quit driver and ignore errors, driver may be already broken.
+#  Processes of browser which were not ended by driver (e.g. renderers of hung page) are killed.
+def quit_driver(my_driver):
+    try:
+        my_driver.quit()
+    except:
+        pass
+    process_groups.kill_browser(get_user_data_dir(my_driver.capabilities))
+
+
+## Main loop of page worker process. Page worker owns one driver during whole testing.
+#  It takes sites from jobs queue one by one and sends back data obtained from browser.
+#  Failed attempt to get data of page is retried according to retry policy of its error type, while it fits into
+#  get_page_data_timeout. Driver is recreated only after errors which break browser session (before retry, or after
+#  data of page are sent) and when browser should be recycled according to browser recycler.
+#  Time of driver creation after data are sent is reported with the next page.
+#  Screenshots are written to disk in background, while the driver loads the next page.
+#  Version of browser is shared with PageWorker object as soon as the first driver is created.
+def page_worker_thread(browser_type, with_jsr, jsr_level, command_executor_url, jobs, send_data_pipe, browser_dir, browser_version, driver_created):
+    screenshot_writer = screenshots.ScreenshotWriter()
+    recycler = BrowserRecycler(browser_type, with_jsr, jsr_level)
+    timer = PhaseTimer()
+    with timer.measure('driver_creation'):
+        my_driver = create_worker_driver(browser_type, with_jsr, jsr_level, command_executor_url, browser_dir)
+    browser_version.value = (driver.get_browser_version(my_driver) or '').encode('utf-8')
+    driver_created.set()
+    recycler.start_session()
+    while True:
+        page_job = jobs.get()
+        if page_job is None:
+            break
+        site, site_number, submit_time, queue_wait = page_job
+        timer.add('queue_wait', queue_wait)
+        recorder = page_errors.ErrorRecorder()
+        while True:
+            recorder.start_attempt()
+            with timer.measure('total'):
+                page_data = get_page_data(my_driver, browser_type, jsr_level, site, site_number, timer, screenshot_writer, recorder)
+            page_error = recorder.get_attempt_error()
+            retry_delay = page_errors.get_retry_delay(page_error, recorder.attempts, submit_time + Config.get_page_data_timeout)
+            if retry_delay is None:
+                break
+            print("Getting data of page is retried in " + str(retry_delay) + " s: " + site)
+            if page_errors.is_session_broken(page_error):
+                quit_driver(my_driver)
+                with timer.measure('driver_creation'):
+                    my_driver = create_worker_driver(browser_type, with_jsr, jsr_level, command_executor_url, browser_dir)
+                recycler.start_session()
+            with timer.measure('retry_backoff'):
+                sleep(retry_delay)
+        send_data_pipe.send(page_data)
+        timer = PhaseTimer()
+        recycle = recycler.record_site(site_number, my_driver.capabilities)
+        if recycle or (page_error is not None and page_errors.is_session_broken(page_error)):
+            quit_driver(my_driver)
+            with timer.measure('driver_creation'):
+                my_driver = create_worker_driver(browser_type, with_jsr, jsr_level, command_executor_url, browser_dir)
+            recycler.start_session()
+    quit_driver(my_driver)
+    screenshot_writer.close()
+
+
+## PageWorker object represents one long-lived process bound to one browser (driver session).
+#
+#  Sites are submitted to the worker through a queue and data obtained from browser are received through a pipe.
+#  Worker process is restarted only when it does not respond until timeout.
+#  Browser is driven by WebDriver server given by URL (Selenium Grid server or local chromedriver).
+class PageWorker:
+    def __init__(self, browser_type, with_jsr, jsr_level, command_executor_url):
+        self.browser_type = browser_type
+        self.with_jsr = with_jsr
+        self.jsr_level = jsr_level
+        self.command_executor_url = command_executor_url
+        self.start()
+
+    ## Start page worker process. Driver is created in the new process.
+    def start(self):
+        self.jobs = Queue()
+        self.receive_data_pipe, self.send_data_pipe = Pipe(False)
+        self.browser_dir = Array('c', 4096)
+        self.browser_version = Array('c', 256)
+        self.driver_created = Event()
+        self.process = Process(target=page_worker_thread, args=(self.browser_type, self.with_jsr, self.jsr_level, self.command_executor_url, self.jobs, self.send_data_pipe,
+                                                                self.browser_dir, self.browser_version, self.driver_created))
+        self.process.start()
+
+    ## Terminate page worker process and close its channels.
+    #  Browser of terminated process is killed, it would be left running otherwise.
+    def terminate(self):
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+            process_groups.kill_browser(self.browser_dir.value.decode('utf-8') or None)
+        self.process.join()
+        self.receive_data_pipe.close()
+        self.send_data_pipe.close()
+
+    ## Terminate not responding page worker process and start a new one.
+    def restart(self):
+        self.terminate()
+        self.start()
+
+    ## Get version of browser driven by page worker. Wait until worker creates its driver, but at most timeout seconds.
+    #  Return None if driver is not created until timeout.
+    def get_browser_version(self, timeout):
+        self.driver_created.wait(timeout)
+        return self.browser_version.value.decode('utf-8') or None
+
+    ## Submit site to page worker. Given time (in seconds) which the site waited in queue of sites is added to its timings.
+    def submit(self, site, site_number, queue_wait):
+        self.jobs.put((site, site_number, time(), queue_wait))
+
+    ## Test if data of the last submitted site are ready.
+    def is_data_ready(self):
+        return self.receive_data_pipe.poll()
+
+    ## Receive data of the last submitted site. If data are not ready, page worker is restarted.
+    def receive_data(self):
+        if self.is_data_ready():
+            return self.receive_data_pipe.recv()
+        self.restart()
+        recorder = page_errors.ErrorRecorder()
+        recorder.add(PageError.WORKER_TIMEOUT, 'total')
+        return build_error_page_data({}, recorder.errors)
+
+    ## Let page worker finish and quit its driver.
+    def stop(self):
+        self.jobs.put(None)
+        self.process.join(Config.page_load_timeout)
+        self.terminate()
+
+
+## Block until all given page workers send data of submitted site or until timeout in seconds expires.
+#  Waiting ends immediately when the last worker sends its data.
+def wait_for_page_data(workers, timeout):
+    deadline = monotonic() + timeout
+    waiting_workers = list(workers)
+    while waiting_workers:
+        remaining_time = deadline - monotonic()
+        if remaining_time <= 0:
+            break
+        ready_pipes = wait([worker.receive_data_pipe for worker in waiting_workers], remaining_time)
+        waiting_workers = [worker for worker in waiting_workers if worker.receive_data_pipe not in ready_pipes]
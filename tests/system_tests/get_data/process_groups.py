@@ -0,0 +1,169 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+## Supervision of processes which run browsers (Selenium Grid nodes, local chromedrivers) and of other servers
+#  started by testing (Selenium Grid server, Web Page Replay).
+#
+#  Every such process is started in its own process group, so chromedrivers and browsers started by it belong to
+#  the same group and can be killed together. Groups are recorded in registry file, so groups left by interrupted
+#  testing are reaped when testing starts again. Single browsers (e.g. of not responding page workers) are found
+#  by their user data directory and killed with all their child processes.
+#  Processes are read from /proc, so leak report and killing single browsers work on Linux only.
+
+import os
+import signal
+from subprocess import Popen, DEVNULL, call
+
+
+REGISTRY_PATH = "../data/process_groups.txt"
+
+## Names of processes run by browsers.
+BROWSER_PROCESS_NAMES = ['chromedriver', 'chrome']
+
+
+## Read registry of process groups. Return list of pairs (process group ID, name of group leader).
+def read_registry():
+    if not os.path.isfile(REGISTRY_PATH):
+        return []
+    groups = []
+    with open(REGISTRY_PATH, 'r', newline='') as f:
+        for line in f:
+            pgid, name = line.rstrip('\n').split(' ', 1)
+            groups.append((int(pgid), name))
+    return groups
+
+
+## Write registry of process groups.
+def write_registry(groups):
+    os.makedirs(os.path.dirname(REGISTRY_PATH), exist_ok=True)
+    with open(REGISTRY_PATH, 'w', newline='') as f:
+        for pgid, name in groups:
+            f.write(str(pgid) + ' ' + name + '\n')
+
+
+## Start process given by command (in given working directory) in a new process group and record the group to registry.
+def start_process_group(command, cwd=None):
+    if os.name == 'nt':
+        process = Popen(command, cwd=cwd, creationflags=0x00000200)
+    else:
+        process = Popen(command, cwd=cwd, start_new_session=True)
+    write_registry(read_registry() + [(process.pid, os.path.basename(command[0]))])
+    return process
+
+
+## Kill all processes of given process group. On Windows, process tree of group leader is killed.
+def kill_group(pgid):
+    if os.name == 'nt':
+        call(['taskkill', '/f', '/t', '/pid', str(pgid)], stdout=DEVNULL, stderr=DEVNULL)
+    else:
+        try:
+            os.killpg(pgid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+## Kill process group started by start_process_group and remove it from registry.
+def end_process_group(process):
+    kill_group(process.pid)
+    process.wait()
+    write_registry([group for group in read_registry() if group[0] != process.pid])
+
+
+## Read running processes from /proc. Return dictionary (PID => dictionary with name, ppid, pgid and cmdline).
+#  Return empty dictionary if /proc is not available.
+def read_processes():
+    processes = {}
+    if not os.path.isdir('/proc'):
+        return processes
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open('/proc/' + entry + '/stat', 'rb') as f:
+                stat = f.read().decode('utf-8', 'replace')
+            with open('/proc/' + entry + '/cmdline', 'rb') as f:
+                cmdline = f.read().decode('utf-8', 'replace').split('\0')
+        except OSError:
+            continue
+        fields = stat[stat.rindex(')') + 2:].split()
+        processes[int(entry)] = {'name': stat[stat.index('(') + 1:stat.rindex(')')], 'ppid': int(fields[1]), 'pgid': int(fields[2]), 'cmdline': cmdline}
+    return processes
+
+
+## Get PIDs of given processes and all their descendants.
+def get_process_trees(processes, pids):
+    tree = set()
+    parents = list(pids)
+    while parents:
+        parent = parents.pop()
+        if parent not in tree:
+            tree.add(parent)
+            parents.extend([pid for pid, process in processes.items() if process['ppid'] == parent])
+    return tree
+
+
+## Kill browser with given user data directory and all its child processes (renderers, GPU process etc.).
+#  It is used after browser session was ended or abandoned, so no processes of the browser are left behind.
+def kill_browser(user_data_dir):
+    if user_data_dir is None or os.name == 'nt':
+        return
+    processes = read_processes()
+    browsers = [pid for pid, process in processes.items()
+                if '--user-data-dir=' + user_data_dir in process['cmdline'] and not any(argument.startswith('--type=') for argument in process['cmdline'])]
+    for pid in get_process_trees(processes, browsers):
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+## Test if group given by process group ID and name of its leader from registry still runs.
+#  Process group ID may be reused by another process after restart of device, so the name of leader is checked too.
+def is_group_running(processes, pgid, name):
+    return pgid in processes and name in [os.path.basename(argument) for argument in processes[pgid]['cmdline']]
+
+
+## Print report of browser processes (chromedrivers and browsers) still running in recorded process groups.
+#  It should be called when all browser sessions are ended, so every reported process is leaked.
+def print_leak_report():
+    processes = read_processes()
+    if not processes:
+        print("Leak report is not available on this system.")
+        return
+    pgids = [pgid for pgid, name in read_registry()]
+    leaked = {}
+    for pid, process in processes.items():
+        if process['pgid'] in pgids and pid != process['pgid'] and any(name in process['name'] for name in BROWSER_PROCESS_NAMES):
+            leaked[process['name']] = leaked.get(process['name'], 0) + 1
+    if leaked:
+        print("Leaked browser processes: " + ", ".join([name + ": " + str(count) for name, count in sorted(leaked.items())]))
+    else:
+        print("No leaked browser processes.")
+
+
+## Kill all recorded process groups which still run, e.g. groups left by interrupted testing, and clear registry.
+#  Running groups can not be recognized without /proc (e.g. on Windows), so only the registry is cleared there.
+def reap_process_groups():
+    processes = read_processes()
+    for pgid, name in read_registry():
+        if is_group_running(processes, pgid, name):
+            kill_group(pgid)
+    write_registry([])
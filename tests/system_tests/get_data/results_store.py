@@ -0,0 +1,153 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+## Store of results of testing in local SQLite database with indexes, so results can be queried without reading all logs.
+#
+#  Every logs record (site, browser, JSR level) is saved as two runs of the page: without JSR and with JSR.
+#  Run without JSR is saved for every JSR level it was compared with.
+#  Console entries, page errors, timings and metadata of screenshot of every run are saved to their own tables.
+#  Records are written incrementally by testing controllers (or coordinator) as soon as they are obtained.
+#  When a site is tested again, its run is replaced unless the older run is completed and the newer one is not.
+
+import sqlite3
+from json import dumps
+
+from configuration import Config
+from test_type import TestType
+import screenshots
+
+
+STORE_PATH = "../data/logs/results.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sites (
+    site_number INTEGER PRIMARY KEY,
+    site TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    site_number INTEGER NOT NULL REFERENCES sites(site_number),
+    browser TEXT NOT NULL,
+    jsr_level INTEGER,
+    with_jsr INTEGER NOT NULL,
+    completed INTEGER NOT NULL,
+    dialogs_dismissed INTEGER,
+    performance TEXT,
+    capture_date TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS runs_key ON runs (jsr_level, browser, site_number, with_jsr);
+CREATE INDEX IF NOT EXISTS runs_site ON runs (site_number);
+CREATE TABLE IF NOT EXISTS console_entries (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    position INTEGER NOT NULL,
+    level TEXT,
+    source TEXT,
+    message TEXT,
+    timestamp INTEGER
+);
+CREATE INDEX IF NOT EXISTS console_entries_run ON console_entries (run_id);
+CREATE INDEX IF NOT EXISTS console_entries_level ON console_entries (level, run_id);
+CREATE TABLE IF NOT EXISTS page_errors (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    position INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    phase TEXT,
+    message TEXT,
+    time REAL
+);
+CREATE INDEX IF NOT EXISTS page_errors_type ON page_errors (type, run_id);
+CREATE TABLE IF NOT EXISTS timings (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    phase TEXT NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS timings_phase ON timings (phase, run_id);
+CREATE INDEX IF NOT EXISTS timings_run ON timings (run_id);
+CREATE TABLE IF NOT EXISTS screenshots (
+    run_id INTEGER PRIMARY KEY REFERENCES runs(run_id),
+    path TEXT NOT NULL,
+    format TEXT NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    grayscale INTEGER NOT NULL
+);
+"""
+
+## Tables with data of runs, they are cleared when run is replaced.
+RUN_TABLES = ['console_entries', 'page_errors', 'timings', 'screenshots']
+
+
+## Open results store and create its tables if they do not exist. Store is shared by more processes,
+#  so write-ahead log is used and writers wait for each other. Connection can be used from another thread
+#  (e.g. executor of asyncio engine), but only by one thread at a time.
+def open_store():
+    store = sqlite3.connect(STORE_PATH, timeout=60, check_same_thread=False)
+    store.execute("PRAGMA journal_mode=WAL")
+    store.executescript(SCHEMA)
+    return store
+
+
+## Get size (width, height) of screenshots in pixels if viewport is fixed, otherwise (None, None).
+def get_screenshot_size():
+    if Config.screenshot_viewport_size is None:
+        return None, None
+    factor = Config.screenshot_device_scale_factor * Config.screenshot_scale
+    return round(Config.screenshot_viewport_size[0] * factor), round(Config.screenshot_viewport_size[1] * factor)
+
+
+## Save one run of page (without or with JSR) from logs record.
+def write_run(store, record, with_jsr):
+    side = 'with_jsr' if with_jsr else 'without_jsr'
+    completed = record['logs_' + side] != "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE"
+    existing = store.execute("SELECT run_id, completed FROM runs WHERE jsr_level = ? AND browser = ? AND site_number = ? AND with_jsr = ?",
+                             (record['jsr_level'], record['browser'], record['site_number'], with_jsr)).fetchone()
+    if existing is not None:
+        if existing[1] and not completed:
+            return
+        for table in RUN_TABLES:
+            store.execute("DELETE FROM " + table + " WHERE run_id = ?", (existing[0],))
+        store.execute("DELETE FROM runs WHERE run_id = ?", (existing[0],))
+    run_id = store.execute("INSERT INTO runs (site_number, browser, jsr_level, with_jsr, completed, dialogs_dismissed, performance, capture_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                           (record['site_number'], record['browser'], record['jsr_level'], with_jsr, completed, record.get('dialogs_' + side),
+                            dumps(record.get('performance_' + side)), None if with_jsr else record.get('baseline_capture_date'))).lastrowid
+    if completed:
+        store.executemany("INSERT INTO console_entries (run_id, position, level, source, message, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+                          [(run_id, position, entry.get('level'), entry.get('source'), entry.get('message'), entry.get('timestamp'))
+                           for position, entry in enumerate(record['logs_' + side])])
+    store.executemany("INSERT INTO page_errors (run_id, position, type, phase, message, time) VALUES (?, ?, ?, ?, ?, ?)",
+                      [(run_id, position, error['type'], error.get('phase'), error.get('message'), error.get('time'))
+                       for position, error in enumerate(record.get('errors_' + side) or [])])
+    store.executemany("INSERT INTO timings (run_id, phase, duration) VALUES (?, ?, ?)",
+                      [(run_id, phase, duration) for phase, duration in (record.get('timings_' + side) or {}).items()])
+    if TestType.SCREENSHOTS in Config.perform_tests:
+        name = "with_jsr_level_" + str(record['jsr_level']) if with_jsr else "without_jsr"
+        width, height = get_screenshot_size()
+        store.execute("INSERT INTO screenshots (run_id, path, format, width, height, grayscale) VALUES (?, ?, ?, ?, ?, ?)",
+                      (run_id, screenshots.get_screenshot_path(record['site'], record['site_number'], name), screenshots.get_file_extension(),
+                       width, height, Config.screenshot_grayscale))
+
+
+## Save logs record (dictionary in format of logs file) to results store in one transaction.
+def write_record(store, record):
+    with store:
+        store.execute("INSERT OR REPLACE INTO sites (site_number, site) VALUES (?, ?)", (record['site_number'], record['site']))
+        write_run(store, record, with_jsr=False)
+        write_run(store, record, with_jsr=True)
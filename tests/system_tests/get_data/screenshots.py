@@ -0,0 +1,130 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+## Screenshots are captured by DevTools command Page.captureScreenshot, so browser encodes them directly in configured
+#  format and scale. Decoding, optional conversion to grayscale and writing to disk run in background thread
+#  of ScreenshotWriter, so browser can continue with the next page meanwhile.
+
+from os import path, replace
+from base64 import b64decode
+from threading import Thread
+from queue import Queue
+
+from configuration import Config
+from screenshot_format import ScreenshotFormat
+import io_funcs as io
+import devtools
+
+
+## File extensions of screenshot formats.
+FILE_EXTENSIONS = {ScreenshotFormat.PNG: '.png', ScreenshotFormat.JPEG: '.jpg'}
+
+
+## Get file extension of screenshots in configured format.
+def get_file_extension():
+    return FILE_EXTENSIONS[Config.screenshot_format]
+
+
+## Get path of screenshot of given site in output folder of screenshots. Name is without_jsr or with_jsr_level_<level>.
+def get_screenshot_path(site, site_number, name):
+    return "../data/screenshots/" + str(site_number) + "_" + site + "/" + name + get_file_extension()
+
+
+## Get parameters of DevTools command Emulation.setDeviceMetricsOverride which fixes viewport of browser.
+def get_viewport_params():
+    width, height = Config.screenshot_viewport_size
+    return {'width': width, 'height': height, 'deviceScaleFactor': Config.screenshot_device_scale_factor, 'mobile': False}
+
+
+## Get parameters of DevTools command Page.captureScreenshot according to configured format and scale.
+def get_capture_params():
+    params = {'format': Config.screenshot_format.value}
+    if Config.screenshot_format == ScreenshotFormat.JPEG:
+        params['quality'] = Config.screenshot_jpeg_quality
+    if Config.screenshot_viewport_size is not None:
+        width, height = Config.screenshot_viewport_size
+        params['clip'] = {'x': 0, 'y': 0, 'width': width, 'height': height, 'scale': Config.screenshot_scale}
+    return params
+
+
+## Fix viewport of browser if it is configured.
+def set_viewport(my_driver):
+    if Config.screenshot_viewport_size is not None:
+        devtools.execute_cdp_command(my_driver, 'Emulation.setDeviceMetricsOverride', get_viewport_params())
+
+
+## Capture screenshot of loaded page. Screenshot is returned encoded in base64 as it was obtained from browser.
+def capture_screenshot(my_driver):
+    return devtools.execute_cdp_command(my_driver, 'Page.captureScreenshot', get_capture_params())['data']
+
+
+## Decode screenshot obtained from browser to content of image file. Screenshot is converted to grayscale if configured.
+#  Packages opencv-python and numpy are imported only for conversion to grayscale, getting data does not need them otherwise.
+def decode_screenshot(screenshot):
+    content = b64decode(screenshot)
+    if not Config.screenshot_grayscale:
+        return content
+    import cv2
+    import numpy as np
+    image = cv2.imdecode(np.frombuffer(content, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if Config.screenshot_format == ScreenshotFormat.JPEG:
+        return cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, Config.screenshot_jpeg_quality])[1].tobytes()
+    return cv2.imencode('.png', image)[1].tobytes()
+
+
+## ScreenshotWriter object writes screenshots to disk in background thread.
+#
+#  Every screenshot is written to temporary file first and renamed then, so only complete images are ever seen
+#  under the final name.
+class ScreenshotWriter:
+    def __init__(self):
+        self.screenshots = Queue()
+        self.thread = Thread(target=self.write_screenshots, daemon=True)
+        self.thread.start()
+
+    ## Write screenshot obtained from browser to all given paths. Given function (if any) is called when screenshot
+    #  is written to all paths, it is not called when writing fails.
+    def write(self, screenshot, paths, after_written=None):
+        self.screenshots.put((screenshot, paths, after_written))
+
+    ## Main loop of background thread. It ends when end mark (None) is received.
+    def write_screenshots(self):
+        while True:
+            screenshot_job = self.screenshots.get()
+            if screenshot_job is None:
+                break
+            screenshot, paths, after_written = screenshot_job
+            try:
+                content = decode_screenshot(screenshot)
+                for screenshot_path in paths:
+                    io.create_folder_structure(path.dirname(screenshot_path))
+                    io.write_binary_file(screenshot_path + ".tmp", content)
+                    replace(screenshot_path + ".tmp", screenshot_path)
+            except Exception:
+                print("An exception occurred while writing screenshot: " + paths[0])
+                continue
+            if after_written is not None:
+                after_written()
+
+    ## Wait until all screenshots are written and end background thread.
+    def close(self):
+        self.screenshots.put(None)
+        self.thread.join()
@@ -0,0 +1,32 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from enum import Enum
+
+
+## Ways of selecting sites for testing from rank range of top sites list.
+#  TOP - the best ranked sites of the range.
+#  RANDOM - random sites from the whole range.
+#  STRATIFIED - range is split to equally large strata of ranks and one random site is taken from every stratum.
+class SitesSampling(Enum):
+    TOP = 1
+    RANDOM = 2
+    STRATIFIED = 3
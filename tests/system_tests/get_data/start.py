@@ -19,152 +19,96 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from time import sleep
-from numpy import array_split
-from multiprocessing import Process, Value, Pipe
+from time import sleep, time, monotonic
+from multiprocessing import Process, Queue
 
 from configuration import Config
 from website import Logs
 import io_funcs as io
 import grid
-import driver
-from web_browser_type import BrowserType
-from test_type import TestType
-
-
-## If JSR is active and set to level 3, close JS alerts if any is open.
-def confirm_alerts_if_open(my_driver, with_jsr, time):
-    if with_jsr and Config.jsr_level == 3:
-        i=0
-        while i<time:
-            try:
-                sleep(0.1)
-                my_driver.switch_to.alert.accept()
-            except:
-                pass
-            finally:
-                i += 1
-
-
-## If JSR is active and set to level 3, open page without XMLHttpRequest and clear logs from previous loaded page.
-def clear_console_logs(my_driver, with_jsr):
-        if with_jsr and Config.jsr_level == 3:
-            my_driver.get('https://polcak.github.io/jsrestrictor/test/test.html')
-            my_driver.get_log('browser')
-
-
-## Receive browser logs from separate thread via pipe.
-def receive_logs(send_logs_pipe_ready, receive_logs_pipe, get_logs_thread):
-    if send_logs_pipe_ready.value == 1:
-        logs = receive_logs_pipe.recv()
-        get_logs_thread.join(10)
-        if get_logs_thread.is_alive():
-            get_logs_thread.terminate()
-            get_logs_thread.join()
-            logs = "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE"
-    else:
-        logs = "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE"
-        if get_logs_thread.is_alive():
-            get_logs_thread.terminate()
-            get_logs_thread.join()
-    return logs
-
-
-## Lod website in given browser and get data (log and screenshot) from browser when website is loaded.
-def get_page_data_thread(my_driver, with_jsr, site, site_number, logs_ready, ret_logs):
-    logs = []
-    confirm_alerts_if_open(my_driver, with_jsr, 20)
-    try:
-        clear_console_logs(my_driver, with_jsr)
-        confirm_alerts_if_open(my_driver, with_jsr, 20)
-        my_driver.get('http://www.' + site)
-        confirm_alerts_if_open(my_driver, with_jsr, 100)
-    except:
-        print("An exception occurred while loading page: " + site)
-        logs = "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE"
-    else:
-        if TestType.LOGS in Config.perform_tests:
-            try:
-                confirm_alerts_if_open(my_driver, with_jsr, 20)
-                logs = my_driver.get_log('browser')
-            except:
-                print("An exception occurred while getting page logs: " + site)
-                logs = "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE"
-        if TestType.SCREENSHOTS in Config.perform_tests:
-            try:
-                jsr = "without"
-                if with_jsr:
-                    jsr = "with"
-                io.create_folder_structure("../data/screenshots/" + str(site_number) + "_" + site)
-                confirm_alerts_if_open(my_driver, with_jsr, 20)
-                my_driver.save_screenshot("../data/screenshots/" + str(site_number) + "_" + site + "/" + jsr + "_jsr" + ".png")
-            except:
-                print("An exception occurred while getting page screenshot: " + site)
-    finally:
-        logs_ready.value = 1
-        ret_logs.send(logs)
-
-
-## Control getting data (logs and data) from one browser type for given part of top sites.
-def testing_controller_thread(thread_mark, browser_type, top_sites, sites_offset):
-    driver_without_jsr = driver.create_driver(browser_type, with_jsr=False, jsr_level=None)
-    driver_with_jsr = driver.create_driver(browser_type, with_jsr=True, jsr_level=Config.jsr_level)
-
-    receive_logs_without_jsr_pipe, send_logs_without_jsr_pipe = Pipe(False)
-    receive_logs_with_jsr_pipe, send_logs_with_jsr_pipe = Pipe(False)
-
-    send_logs_without_jsr_pipe_ready = Value('i', 0)
-    send_logs_with_jsr_pipe_ready = Value('i', 0)
-
-    site_number = 1
-    top_sites_number = len(top_sites)
-    for top_site in top_sites:
-        print("Thread " + thread_mark + ": " + str(browser_type) + ": Page " + str(site_number) + " of " + str(top_sites_number) + ": " + top_site)
-
-        logs_without_jsr = "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE"
-        logs_with_jsr = "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE"
-
-        send_logs_without_jsr_pipe_ready.value = 0
-        send_logs_with_jsr_pipe_ready.value = 0
-
-        get_logs_without_jsr_thread = Process(target=get_page_data_thread, args=(driver_without_jsr, False, top_site, sites_offset + site_number, send_logs_without_jsr_pipe_ready, send_logs_without_jsr_pipe))
-        get_logs_without_jsr_thread.start()
-
-        get_logs_with_jsr_thread = Process(target=get_page_data_thread, args=(driver_with_jsr, True, top_site, sites_offset + site_number, send_logs_with_jsr_pipe_ready, send_logs_with_jsr_pipe))
-        get_logs_with_jsr_thread.start()
-
-        for _ in range(int(Config.get_page_data_timeout/Config.wait_between_checks_if_page_data_loaded)):
-            sleep(Config.wait_between_checks_if_page_data_loaded)
-            if send_logs_without_jsr_pipe_ready.value == 1 and send_logs_with_jsr_pipe_ready.value == 1:
-                break
-
-        logs_without_jsr = receive_logs(send_logs_without_jsr_pipe_ready, receive_logs_without_jsr_pipe, get_logs_without_jsr_thread)
-        logs_with_jsr = receive_logs(send_logs_with_jsr_pipe_ready, receive_logs_with_jsr_pipe, get_logs_with_jsr_thread)
-
-        if logs_without_jsr == "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE" or logs_without_jsr == "":
-            driver_without_jsr = driver.create_driver(browser_type, with_jsr=False, jsr_level=None)
-
-        if logs_with_jsr == "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE" or logs_without_jsr == "":
-            driver_with_jsr = driver.create_driver(browser_type, with_jsr=True, jsr_level=Config.jsr_level)
-
-        page_logs = Logs(top_site, logs_without_jsr, logs_with_jsr)
-        io.append_file("../data/logs/logs_part_" + thread_mark + ".json", page_logs.to_json() + ',')
-        site_number += 1
-
-    receive_logs_without_jsr_pipe.close()
-    send_logs_without_jsr_pipe.close()
-    receive_logs_with_jsr_pipe.close()
-    send_logs_with_jsr_pipe.close()
-
-    driver_without_jsr.quit()
-    driver_with_jsr.quit()
+import process_groups
+import local_drivers
+import journal
+import coordinator
+import results_store
+import metrics
+import top_sites as sites
+import baseline_cache
+import fixture_server
+import web_replay
+import timings
+from page_worker import PageWorker, wait_for_page_data
+import async_engine
+from crawler_engine import CrawlerEngine
+from driver_mode import DriverMode
+
+
+## Control getting data (logs and data) from one browser type.
+#  Sites are taken from the queue shared by all controllers of the same browser type until the queue is drained.
+#  In distributed testing (no queue is given), sites are leased from coordinator and logs are sent to it.
+#  Every site is loaded without JSR and on every JSR level at the same time, page loaded without JSR is shared by all levels.
+#  Page is not loaded without JSR when it is found in baseline cache for the version of tested browser.
+#  Version of tested browser is taken from the first worker with JSR before the first site. When baseline cache is used,
+#  worker without JSR is started on the first site which is not found in cache.
+#  Events about tested sites are sent to queue of metrics collector.
+def testing_controller_thread(thread_mark, browser_type, site_queue, top_sites_number, events):
+    command_executor_url = local_drivers.get_command_executor_url(thread_mark)
+    worker_without_jsr = None
+    if not Config.use_baseline_cache:
+        worker_without_jsr = PageWorker(browser_type, with_jsr=False, jsr_level=None, command_executor_url=command_executor_url)
+    workers_with_jsr = [PageWorker(browser_type, with_jsr=True, jsr_level=jsr_level, command_executor_url=command_executor_url) for jsr_level in Config.jsr_levels]
+    client = coordinator.CoordinatorClient(browser_type) if site_queue is None else None
+    logs_part = io.open_logs_part(thread_mark, browser_type) if client is None else None
+    store = results_store.open_store() if client is None else None
+    browser_version = None
+    if Config.use_baseline_cache:
+        browser_version = workers_with_jsr[0].get_browser_version(Config.get_page_data_timeout)
+
+    while True:
+        site_job = (client or site_queue).get()
+        if site_job is None:
+            break
+        site_number, top_site, queued_time = site_job
+        queue_wait = time() - queued_time
+        print("Thread " + thread_mark + ": " + str(browser_type) + ": Page with rank " + str(site_number) + " (" + str(top_sites_number) + " sites to test): " + top_site)
+
+        page_data_without_jsr = baseline_cache.load_page_data(top_site, site_number, browser_type, browser_version)
+        working_workers = list(workers_with_jsr)
+        if page_data_without_jsr is None:
+            if worker_without_jsr is None:
+                worker_without_jsr = PageWorker(browser_type, with_jsr=False, jsr_level=None, command_executor_url=command_executor_url)
+            working_workers.append(worker_without_jsr)
+        site_start = monotonic()
+        metrics.record_site_started(events, thread_mark, browser_type, len(working_workers))
+        for worker in working_workers:
+            worker.submit(top_site, site_number, queue_wait)
+
+        wait_for_page_data(working_workers, Config.get_page_data_timeout)
+
+        if page_data_without_jsr is None:
+            page_data_without_jsr = worker_without_jsr.receive_data()
+        site_logs = []
+        for worker_with_jsr in workers_with_jsr:
+            page_data_with_jsr = worker_with_jsr.receive_data()
+            browser_version = page_data_with_jsr.browser_version or browser_version
+            site_logs.append(Logs(top_site, site_number, browser_type, worker_with_jsr.jsr_level, page_data_without_jsr, page_data_with_jsr))
+        coordinator.save_site_logs(client, logs_part, store, site_logs)
+        metrics.record_site_finished(events, thread_mark, browser_type, command_executor_url, monotonic() - site_start, site_logs)
+
+    if logs_part is not None:
+        logs_part.close()
+        store.close()
+    if worker_without_jsr is not None:
+        worker_without_jsr.stop()
+    for worker_with_jsr in workers_with_jsr:
+        worker_with_jsr.stop()
 
 
 ## Start separate thread for every browser type for perform tests.
-def run_browsers_thread(thread_mark, browser_job, sites_offset):
+def run_browsers_thread(thread_mark, site_queues, top_sites_number, events):
     browser_threads = []
     for browser_type in Config.tested_browsers:
-        new_thread = Process(target=testing_controller_thread, args=(thread_mark, browser_type, browser_job, sites_offset))
+        new_thread = Process(target=testing_controller_thread, args=(thread_mark, browser_type, site_queues[browser_type], top_sites_number, events))
         browser_threads.append(new_thread)
         new_thread.start()
 
@@ -172,44 +116,109 @@ def run_browsers_thread(thread_mark, browser_job, sites_offset):
         thread.join()
 
 
-## Start parallel threads for getting data from browsers and divide work to processes.
-def run_getting_logs_threads():
+## Create queue of sites for every browser type. Every site is given to the first controller which asks for a new site,
+#  so a controller stuck on slow sites does not hold sites back from the other ones.
+#  Sites are given as tuples (rank, site), rank is used as site number. Sites already completed according to journal are skipped.
+#  Sites are queued as tuples (site_number, site, time of queueing), so waiting of site in the queue is measured.
+#  The queue is terminated by one end mark (None) for every controller. Numbers of queued sites are set to metrics collector.
+def create_site_queues(numbered_sites, completed_units, collector):
+    site_queues = {}
+    for browser_type in Config.tested_browsers:
+        site_queue = Queue()
+        unfinished_sites = journal.get_unfinished_sites(numbered_sites, completed_units, browser_type, Config.jsr_levels)
+        collector.set_queued_sites(browser_type, len(unfinished_sites))
+        queued_time = time()
+        for site_number, site in unfinished_sites:
+            site_queue.put((site_number, site, queued_time))
+        for _ in range(Config.number_of_concurrent_sites_testing):
+            site_queue.put(None)
+        site_queues[browser_type] = site_queue
+    return site_queues
+
+
+## Start parallel threads for getting data from browsers. Threads share queues of sites to test.
+#  In distributed testing, every thread leases sites from coordinator instead.
+#  Threads send events about tested sites to given metrics collector.
+def run_getting_logs_threads(collector):
     if not Config.perform_tests:
         print("'perform_tests' property in Configuration is empty. No test to perform.")
     else:
-        top_sites = io.read_n_top_rows_csv(n=Config.number_of_sites_for_testing)
-        browser_jobs = array_split(top_sites, Config.number_of_concurrent_sites_testing)
+        if Config.coordinator_address is not None:
+            site_queues = {browser_type: None for browser_type in Config.tested_browsers}
+            top_sites_number = coordinator.get_sites_number()
+        else:
+            top_sites = sites.read_sites_for_testing()
+            site_queues = create_site_queues(top_sites, journal.read_completed_units(), collector)
+            top_sites_number = len(top_sites)
         testing_threads = []
         thread_mark = 'A'
-        sites_offset = 0
-        for browser_job in browser_jobs:
-            new_thread = Process(target=run_browsers_thread, args=(thread_mark, browser_job, sites_offset))
+        for _ in range(Config.number_of_concurrent_sites_testing):
+            new_thread = Process(target=run_browsers_thread, args=(thread_mark, site_queues, top_sites_number, collector.events))
             testing_threads.append(new_thread)
             new_thread.start()
             thread_mark = chr(ord(thread_mark) + 1)
-            sites_offset += len(browser_job)
 
         for thread in testing_threads:
             thread.join()
 
 
 ## Main function of getting data.
+#  Selenium Grid (or local chromedrivers), fixture server and Web Page Replay start at the same time and testing starts
+#  as soon as browsers can be driven.
+#  Process groups left by interrupted testing are killed before start. Browser processes left running after testing
+#  are reported and killed. Live metrics of testing are served during testing.
+#  Selenium Grid (or local chromedrivers) is ended even when other servers fail to start.
 def main():
-    if Config.grid_server_ip_address == 'localhost':
-        server = grid.start_server()
-    nodes = grid.start_nodes()
+    process_groups.reap_process_groups()
+    if Config.driver_mode == DriverMode.LOCAL:
+        local_drivers_processes = local_drivers.start_local_drivers()
+    else:
+        if Config.grid_server_ip_address == 'localhost':
+            server = grid.start_server()
+        nodes = grid.start_nodes()
 
-    if Config.grid_server_ip_address == 'localhost':
+    if Config.driver_mode == DriverMode.LOCAL or Config.grid_server_ip_address == 'localhost':
+        fixtures = web_replay_server = collector = metrics_server = None
         try:
-            io.init_output_files()
-            run_getting_logs_threads()
-            io.finish_output_files()
+            fixtures = fixture_server.start_fixture_server()
+            web_replay_server = web_replay.start_web_replay()
+            collector = metrics.MetricsCollector()
+            metrics_server = metrics.start_metrics_server(collector)
+            if Config.driver_mode == DriverMode.LOCAL:
+                local_drivers.wait_for_local_drivers(local_drivers_processes)
+            else:
+                grid.wait_for_grid([server] + nodes, len(nodes))
+            start_time = monotonic()
+            # Worker of distributed testing sends logs to coordinator, which saves and finishes them.
+            io.init_output_files(keep_existing=journal.can_resume() or Config.coordinator_address is not None)
+            journal_offset = journal.get_journal_offset()
+            if Config.crawler_engine == CrawlerEngine.ASYNCIO:
+                async_engine.run_getting_logs(collector)
+            else:
+                run_getting_logs_threads(collector)
+            if Config.coordinator_address is None:
+                io.finish_output_files()
+                journal.mark_finished()
+                timings.print_timings_summary("../data/logs/logs.ndjson", "../data/logs/timings_summary.json",
+                                             journal.count_tested_sites(journal_offset), monotonic() - start_time)
         finally:
+            metrics.end_metrics_server(metrics_server, collector)
+            web_replay.end_web_replay(web_replay_server)
+            fixture_server.end_fixture_server(fixtures)
             sleep(3)
+            process_groups.print_leak_report()
             io.terminate_zombie_processes()
-            grid.end_nodes(nodes, manually=False)
-            grid.end_server(server)
+            if Config.driver_mode == DriverMode.LOCAL:
+                local_drivers.end_local_drivers(local_drivers_processes)
+            else:
+                grid.end_nodes(nodes, manually=False)
+                grid.end_server(server)
     else:
+        try:
+            grid.wait_for_grid(nodes, len(nodes))
+        except:
+            grid.end_nodes(nodes, manually=False)
+            raise
         grid.end_nodes(nodes, manually=True)
 
 
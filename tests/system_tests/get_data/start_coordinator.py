@@ -0,0 +1,55 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from time import sleep, monotonic
+
+from configuration import Config
+import io_funcs as io
+import journal
+import top_sites as sites
+import timings
+import coordinator
+
+
+## Main function of coordinator of distributed testing.
+#  Sites are leased to workers (start.py with coordinator_address set) until all of them are tested in all browsers.
+#  Coordinator is kept running a while after the last result, so waiting workers learn that testing is finished.
+def main():
+    io.init_output_files(keep_existing=journal.can_resume())
+    journal_offset = journal.get_journal_offset()
+    service = coordinator.Coordinator(sites.read_sites_for_testing(), journal.read_completed_units())
+    server = coordinator.start_coordinator_server(service)
+    print("Coordinator is listening on port " + str(Config.coordinator_port) + ".")
+    start_time = monotonic()
+    try:
+        service.done.wait()
+        sleep(2 * coordinator.RETRY_INTERVAL)
+    finally:
+        coordinator.end_coordinator_server(server)
+        service.close()
+    io.finish_output_files()
+    journal.mark_finished()
+    timings.print_timings_summary("../data/logs/logs.ndjson", "../data/logs/timings_summary.json",
+                                 journal.count_tested_sites(journal_offset), monotonic() - start_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -26,3 +26,4 @@ from enum import Enum
 class TestType(Enum):
     LOGS = 1
     SCREENSHOTS = 2
+    PERFORMANCE = 3
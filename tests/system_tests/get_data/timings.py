@@ -0,0 +1,100 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from contextlib import contextmanager
+from math import ceil
+from time import time
+from json import dumps
+
+import io_funcs as io
+
+
+## Phases of getting data of one page which are measured.
+PHASES = ['queue_wait', 'driver_creation', 'console_clear', 'page_load', 'page_settle', 'log_fetch', 'screenshot', 'performance_fetch', 'retry_backoff', 'total']
+
+## Percentiles printed in summary of timings.
+PERCENTILES = [50, 95, 99]
+
+
+## PhaseTimer object measures duration (in seconds) of phases of getting data of one page.
+#  The last started phase is kept, so errors can be assigned to phase in which they occurred.
+class PhaseTimer:
+    def __init__(self):
+        self.timings = {}
+        self.phase = None
+
+    ## Add duration to given phase.
+    def add(self, phase, duration):
+        self.timings[phase] = round(self.timings.get(phase, 0) + duration, 3)
+
+    ## Measure duration of code block as given phase.
+    @contextmanager
+    def measure(self, phase):
+        self.phase = phase
+        start = time()
+        try:
+            yield
+        finally:
+            self.add(phase, time() - start)
+
+
+## Get percentile of sorted values (nearest-rank method).
+def get_percentile(sorted_values, percentile):
+    return sorted_values[max(0, ceil(percentile / 100 * len(sorted_values)) - 1)]
+
+
+## Build summary of timings of all sites in logs. Summary contains percentiles of every phase for browsers
+#  without JSR and with JSR on every level and throughput of testing in sites per hour.
+#  Throughput is computed from given number of sites tested in elapsed time, because logs of resumed testing
+#  contain also sites tested before interruption.
+#  Timings of page loaded without JSR are shared by records of all levels, so they are counted once per site.
+#  Timings of pages taken from baseline cache were measured in previous testing and they are not counted.
+def build_timings_summary(logs_path, sites_number, elapsed_time):
+    durations = {}
+    tested_sites = set()
+    for _, record in io.read_ndjson_records(logs_path):
+        tested_site = (record["site"], record.get("browser"))
+        if tested_site not in tested_sites and record.get("baseline_capture_date") is None:
+            for phase, duration in (record.get("timings_without_jsr") or {}).items():
+                durations.setdefault("without_jsr", {}).setdefault(phase, []).append(duration)
+        tested_sites.add(tested_site)
+        for phase, duration in (record.get("timings_with_jsr") or {}).items():
+            durations.setdefault("with_jsr_level_" + str(record.get("jsr_level")), {}).setdefault(phase, []).append(duration)
+    summary = {"sites": sites_number, "elapsed_time": round(elapsed_time, 1), "sites_per_hour": round(sites_number / elapsed_time * 3600, 1) if elapsed_time > 0 else None, "phases": {}}
+    for jsr, phases in durations.items():
+        summary["phases"][jsr] = {}
+        for phase in PHASES:
+            if phase in phases:
+                values = sorted(phases[phase])
+                summary["phases"][jsr][phase] = {"p" + str(percentile): get_percentile(values, percentile) for percentile in PERCENTILES}
+    return summary
+
+
+## Print summary of timings at the end of getting data and save it next to logs.
+def print_timings_summary(logs_path, summary_path, sites_number, elapsed_time):
+    summary = build_timings_summary(logs_path, sites_number, elapsed_time)
+    print("Tested sites: " + str(summary["sites"]) + " in " + str(summary["elapsed_time"]) + " s (" + str(summary["sites_per_hour"]) + " sites per hour)")
+    for jsr, phases in summary["phases"].items():
+        print("Timings of phases " + jsr.replace('_', ' ') + " (seconds):")
+        for phase, percentiles in phases.items():
+            print("  " + phase.ljust(16) + "  ".join([name + ": " + str(value).rjust(8) for name, value in percentiles.items()]))
+    with open(summary_path, 'w', newline='') as f:
+        f.write(dumps(summary, indent=2))
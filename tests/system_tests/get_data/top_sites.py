@@ -0,0 +1,125 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+## Reading sites for testing from top sites list (Tranco CSV file with rows "rank,site").
+#
+#  The list is read row by row and reading stops at the end of rank range, so only selected sites are kept in memory.
+#  Sites are selected from rank range (e.g. 10001-20000), which allows to split large testing across devices.
+#  Excluded sites are skipped. Random sampling is reproducible by given seed.
+
+import csv
+import random
+
+from configuration import Config
+from sites_sampling import SitesSampling
+
+
+## Read sites (one per line) from given exclusion list. Lines can be also in top sites list format "rank,site".
+#  Empty lines and lines starting with '#' are ignored.
+def read_excluded_sites(excluded_sites_path):
+    excluded_sites = set()
+    with open(excluded_sites_path, 'r', newline='') as f:
+        for row in csv.reader(f):
+            if row and row[-1].strip() and not row[0].startswith('#'):
+                excluded_sites.add(row[-1].strip())
+    return excluded_sites
+
+
+## Read top sites list lazily. Yield tuples (rank, site) of sites in given rank range, which are not excluded.
+#  Last rank None means the end of the list.
+def read_ranked_sites(csv_path, first_rank, last_rank, excluded_sites):
+    with open(csv_path, 'r', newline='') as f:
+        for row in csv.reader(f):
+            if len(row) < 2 or not row[0].isdigit():
+                continue
+            rank = int(row[0])
+            if last_rank is not None and rank > last_rank:
+                break
+            if rank >= first_rank and row[1] not in excluded_sites:
+                yield rank, row[1]
+
+
+## Get the last rank in top sites list.
+def get_last_rank(csv_path):
+    last_rank = 0
+    for rank, site in read_ranked_sites(csv_path, 1, None, set()):
+        last_rank = rank
+    return last_rank
+
+
+## Take the first n sites.
+def take_top_sites(ranked_sites, n):
+    sites = []
+    if n <= 0:
+        return sites
+    for ranked_site in ranked_sites:
+        sites.append(ranked_site)
+        if len(sites) == n:
+            break
+    return sites
+
+
+## Take n random sites by reservoir sampling, so only n sites are kept in memory.
+def take_random_sites(ranked_sites, n, generator):
+    sites = []
+    for count, ranked_site in enumerate(ranked_sites):
+        if count < n:
+            sites.append(ranked_site)
+        else:
+            position = generator.randint(0, count)
+            if position < n:
+                sites[position] = ranked_site
+    return sorted(sites)
+
+
+## Split rank range to n strata of (nearly) the same size and take one random site from every stratum
+#  by reservoir sampling. Stratum without any site which is not excluded gives no site.
+def take_stratified_sites(ranked_sites, n, first_rank, last_rank, generator):
+    range_size = last_rank - first_rank + 1
+    if range_size <= 0 or n <= 0:
+        return []
+    strata_size = min(n, range_size)
+    sites = [None] * strata_size
+    counts = [0] * strata_size
+    for rank, site in ranked_sites:
+        stratum = (rank - first_rank) * strata_size // range_size
+        counts[stratum] += 1
+        if generator.randint(1, counts[stratum]) == 1:
+            sites[stratum] = (rank, site)
+    return [ranked_site for ranked_site in sites if ranked_site is not None]
+
+
+## Read sites for testing according to Config. Return list of tuples (rank, site) sorted by rank.
+#  Rank of site in top sites list is used as site number, so results of testings of different rank ranges can be merged.
+def read_sites_for_testing():
+    excluded_sites = set()
+    for excluded_sites_path in Config.excluded_sites_paths:
+        excluded_sites |= read_excluded_sites(excluded_sites_path)
+    first_rank, last_rank = Config.sites_rank_range or (1, None)
+    ranked_sites = read_ranked_sites(Config.sites_to_test_csv_path, first_rank, last_rank, excluded_sites)
+    generator = random.Random(Config.sites_sampling_seed)
+    if Config.sites_sampling == SitesSampling.RANDOM:
+        return take_random_sites(ranked_sites, Config.number_of_sites_for_testing, generator)
+    if Config.sites_sampling == SitesSampling.STRATIFIED:
+        if last_rank is None:
+            last_rank = get_last_rank(Config.sites_to_test_csv_path)
+        return take_stratified_sites(ranked_sites, Config.number_of_sites_for_testing, first_rank, last_rank, generator)
+    return take_top_sites(ranked_sites, Config.number_of_sites_for_testing)
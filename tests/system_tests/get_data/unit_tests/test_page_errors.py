@@ -0,0 +1,62 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import pytest
+
+from configuration import Config
+from page_error import PageError
+import page_errors
+
+
+## Current time is fixed, so deadlines of tests are exact.
+NOW = 1000.0
+
+
+@pytest.fixture(autouse=True)
+def fixed_time(monkeypatch):
+    monkeypatch.setattr(page_errors, 'time', lambda: NOW)
+
+
+## Retry is scheduled when backoff and the whole next attempt fit into deadline.
+def test_retry_fits_into_deadline():
+    deadline = NOW + Config.page_error_retry_backoff + page_errors.get_attempt_duration(PageError.NAVIGATION_FAILED)
+    assert page_errors.get_retry_delay(PageError.NAVIGATION_FAILED, 1, deadline) == Config.page_error_retry_backoff
+
+
+## Retry is not scheduled when deadline allows backoff and page load, but not the whole attempt
+#  (page settle and other steps), data of retried attempt would be lost by timeout of controller.
+def test_no_retry_when_only_page_load_fits():
+    deadline = NOW + Config.page_error_retry_backoff + Config.page_load_timeout + 1
+    assert page_errors.get_retry_delay(PageError.NAVIGATION_FAILED, 1, deadline) is None
+
+
+## Creation of a new browser session is reserved for errors which break the session.
+def test_driver_creation_reserved_for_broken_session():
+    deadline = NOW + Config.page_error_retry_backoff + page_errors.get_attempt_duration(PageError.NAVIGATION_FAILED)
+    assert page_errors.get_retry_delay(PageError.SESSION_LOST, 1, deadline) is None
+    deadline += page_errors.DRIVER_CREATION_TIME
+    assert page_errors.get_retry_delay(PageError.SESSION_LOST, 1, deadline) == Config.page_error_retry_backoff
+
+
+## Error is not retried more times than its retry policy allows.
+def test_no_retry_after_allowed_attempts():
+    deadline = NOW + 10000
+    assert page_errors.get_retry_delay(PageError.NAVIGATION_FAILED, Config.page_error_retries[PageError.NAVIGATION_FAILED] + 1, deadline) is None
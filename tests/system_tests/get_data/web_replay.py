@@ -0,0 +1,101 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+## Record and replay of HTTP(S) traffic of tested sites by Web Page Replay (wpr) tool of Chromium project.
+#
+#  In record mode, wpr forwards browsers' requests to the internet and records responses to archive.
+#  In replay mode, wpr answers browsers' requests from the archive, so browsers with and without JSR get the same
+#  responses and testing needs no network. Browsers are pointed to wpr by host resolver rules.
+
+import os
+import signal
+import socket
+from pathlib import Path
+from time import sleep, monotonic
+
+from configuration import Config
+from web_replay_mode import WebReplayMode
+import process_groups
+
+
+## Wait until server starts listening on given port of this device.
+def wait_for_port(port, timeout):
+    deadline = monotonic() + timeout
+    while monotonic() < deadline:
+        try:
+            socket.create_connection(('localhost', port), 1).close()
+            return True
+        except OSError:
+            sleep(0.2)
+    return False
+
+
+## Start Web Page Replay as a new process group on background according to web_replay_mode in Config.
+#  Return None if Web Page Replay is not used. Raise error when it does not start listening on its ports in time,
+#  testing would fail on every site otherwise.
+def start_web_replay():
+    if Config.web_replay_mode == WebReplayMode.OFF:
+        return None
+    if Config.web_replay_mode == WebReplayMode.RECORD:
+        Path(Config.web_replay_archive_path).parent.mkdir(parents=True, exist_ok=True)
+        mode = 'record'
+    else:
+        mode = 'replay'
+    command = [os.path.abspath(Config.wpr_path), mode,
+               '--http_port=' + str(Config.web_replay_http_port),
+               '--https_port=' + str(Config.web_replay_https_port),
+               # Scripts making pages deterministic (e.g. fixed Date and Math.random) would affect JSR, do not inject them.
+               '--inject_scripts=',
+               os.path.abspath(Config.web_replay_archive_path)]
+    # wpr saves archive when it is interrupted, on Windows CTRL_BREAK_EVENT can be sent only to a new process group.
+    web_replay = process_groups.start_process_group(command, cwd=Config.wpr_directory_path)
+    if not wait_for_port(Config.web_replay_http_port, 30) or not wait_for_port(Config.web_replay_https_port, 30):
+        process_groups.end_process_group(web_replay)
+        raise TimeoutError("Web Page Replay did not start listening in 30 seconds.")
+    return web_replay
+
+
+## End Web Page Replay. In record mode, wpr writes archive when it is interrupted.
+#  Its process group is killed then, so no process of wpr is left running.
+def end_web_replay(web_replay):
+    if web_replay is None:
+        return
+    if os.name == 'nt':
+        web_replay.send_signal(signal.CTRL_BREAK_EVENT)
+    else:
+        web_replay.send_signal(signal.SIGINT)
+    try:
+        web_replay.wait(120)
+    except:
+        pass
+    process_groups.end_process_group(web_replay)
+
+
+## Get command line arguments of browser which redirect all HTTP(S) traffic of browser to Web Page Replay.
+#  Return empty list if Web Page Replay is not used.
+def get_browser_arguments():
+    if Config.web_replay_mode == WebReplayMode.OFF:
+        return []
+    address = Config.web_replay_address
+    return ['--host-resolver-rules=MAP *:80 ' + address + ':' + str(Config.web_replay_http_port) +
+            ',MAP *:443 ' + address + ':' + str(Config.web_replay_https_port) +
+            ',EXCLUDE localhost,EXCLUDE ' + Config.fixture_server_address,
+            '--ignore-certificate-errors-spki-list=' + Config.web_replay_certificate_spki]
@@ -0,0 +1,32 @@
+#
+#  JavaScript Restrictor is a browser extension which increases level
+#  of security, anonymity and privacy of the user while browsing the
+#  internet.
+#
+#  Copyright (C) 2020  Martin Bednar
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from enum import Enum
+
+
+## Modes of Web Page Replay during getting data.
+#  OFF - browsers load sites from the internet.
+#  RECORD - browsers load sites from the internet through Web Page Replay, which records traffic to archive.
+#  REPLAY - browsers load sites from the archive recorded before, no internet connection is needed.
+class WebReplayMode(Enum):
+    OFF = 1
+    RECORD = 2
+    REPLAY = 3
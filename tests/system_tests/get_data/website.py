@@ -22,17 +22,72 @@
 from json import dumps
 
 
+## From the class PageData object is created for every website loaded in one browser. It contains data obtained
+#  from browser when the website was loaded.
+#  Version of browser and date of capture (for page data taken from baseline cache) are set when they are known.
+#  Errors of all failed attempts to get data are recorded with their types, phases and times.
+class PageData:
+    logs = []
+    dialogs_dismissed = None
+    timings = {}
+    performance = None
+    errors = []
+    browser_version = None
+    capture_date = None
+
+    def __init__(self, logs, dialogs_dismissed, timings, performance, errors=None):
+        self.logs = logs
+        self.dialogs_dismissed = dialogs_dismissed
+        self.timings = timings
+        self.performance = performance
+        self.errors = errors if errors is not None else []
+
+
 ## From the class Logs object for every website is created. One object contains logs from browsers with and without JSR
 #  when the same page is loaded.
 class Logs:
     site = ''
+    site_number = 0
+    browser = ''
+    jsr_level = None
     logs_without_jsr = []
     logs_with_jsr = []
+    dialogs_without_jsr = None
+    dialogs_with_jsr = None
+    timings_without_jsr = {}
+    timings_with_jsr = {}
+    performance_without_jsr = None
+    performance_with_jsr = None
+    errors_without_jsr = []
+    errors_with_jsr = []
+    baseline_capture_date = None
 
-    def __init__(self, site, logs_without_jsr, logs_with_jsr):
+    def __init__(self, site, site_number, browser_type, jsr_level, page_data_without_jsr, page_data_with_jsr):
         self.site = site
-        self.logs_without_jsr = logs_without_jsr
-        self.logs_with_jsr = logs_with_jsr
+        self.site_number = site_number
+        self.browser = str(browser_type)
+        self.jsr_level = jsr_level
+        self.logs_without_jsr = page_data_without_jsr.logs
+        self.logs_with_jsr = page_data_with_jsr.logs
+        self.dialogs_without_jsr = page_data_without_jsr.dialogs_dismissed
+        self.dialogs_with_jsr = page_data_with_jsr.dialogs_dismissed
+        self.timings_without_jsr = page_data_without_jsr.timings
+        self.timings_with_jsr = page_data_with_jsr.timings
+        self.performance_without_jsr = page_data_without_jsr.performance
+        self.performance_with_jsr = page_data_with_jsr.performance
+        self.errors_without_jsr = page_data_without_jsr.errors
+        self.errors_with_jsr = page_data_with_jsr.errors
+        self.baseline_capture_date = page_data_without_jsr.capture_date
+
+    ## Test if data were obtained from both browsers without error.
+    def is_completed(self):
+        return self.logs_without_jsr != "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE" and self.logs_with_jsr != "ERROR_WHILE_LOADING_THIS_OR_PREVIOUS_PAGE"
 
     def to_json(self):
-        return '{"site": "' + self.site + '", "logs_without_jsr": ' + dumps(self.logs_without_jsr) + ', "logs_with_jsr": ' + dumps(self.logs_with_jsr) + '}'
+        return '{"site": "' + self.site + '", "site_number": ' + str(self.site_number) + ', "browser": "' + self.browser + '", "jsr_level": ' + dumps(self.jsr_level) + \
+               ', "logs_without_jsr": ' + dumps(self.logs_without_jsr) + ', "logs_with_jsr": ' + dumps(self.logs_with_jsr) + \
+               ', "dialogs_without_jsr": ' + dumps(self.dialogs_without_jsr) + ', "dialogs_with_jsr": ' + dumps(self.dialogs_with_jsr) + \
+               ', "timings_without_jsr": ' + dumps(self.timings_without_jsr) + ', "timings_with_jsr": ' + dumps(self.timings_with_jsr) + \
+               ', "performance_without_jsr": ' + dumps(self.performance_without_jsr) + ', "performance_with_jsr": ' + dumps(self.performance_with_jsr) + \
+               ', "errors_without_jsr": ' + dumps(self.errors_without_jsr) + ', "errors_with_jsr": ' + dumps(self.errors_with_jsr) + \
+               ', "baseline_capture_date": ' + dumps(self.baseline_capture_date) + '}'
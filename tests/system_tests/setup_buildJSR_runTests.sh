@@ -59,4 +59,5 @@ python3 ./start.py
 cd ../analyze_data
 python3 ./start_screenshots_analysis.py
 python3 ./start_logs_analysis.py
+python3 ./start_performance_analysis.py
 cd ../